@@ -195,6 +195,8 @@ rst_prolog = """
 .. |Node| replace:: :class:`~pyphi.node.Node`
 .. |CoarseGrain| replace:: :class:`~pyphi.macro.CoarseGrain`
 .. |Blackbox| replace:: :class:`~pyphi.macro.Blackbox`
+.. |Progress| replace:: :class:`~pyphi.compute.progress.Progress`
+.. |Checkpoint| replace:: :class:`~pyphi.checkpoint.Checkpoint`
 .. |find_mip| replace:: :meth:`~pyphi.subsystem.Subsystem.find_mip`
 .. |find_mice| replace:: :meth:`~pyphi.subsystem.Subsystem.find_mice`
 .. |loli_index2state| replace:: :class:`~pyphi.convert.loli_index2state`
@@ -59,13 +59,14 @@ and their defaults.
 
 from .__about__ import *
 from . import (config, constants, convert, db, examples, jsonify, macro,
-               models, network, node, subsystem, utils, validate)
+               measures, models, network, node, subsystem, symmetry, utils,
+               validate)
 from .network import Network
 from .subsystem import Subsystem
 
 __all__ = ['Network', 'Subsystem', 'config', 'constants', 'convert', 'db',
-           'examples', 'jsonify', 'macro', 'models', 'network', 'node',
-           'subsystem', 'utils', 'validate']
+           'examples', 'jsonify', 'macro', 'measures', 'models', 'network',
+           'node', 'subsystem', 'symmetry', 'utils', 'validate']
 
 import logging
 import logging.config
@@ -324,7 +324,8 @@ class RedisMiceCache(RedisCache):
                                      str(self.parent_subsystem_hash), 1)
             mice = super().get(parent_key)
 
-            if mice is not None and not mice.damaged_by_cut(self.subsystem):
+            if (mice is not None and
+                    not self.subsystem.mice_damaged_by_cut(mice)):
                 return mice
 
         return None
@@ -339,8 +340,12 @@ class RedisMiceCache(RedisCache):
 
     def key(self, direction, mechanism, purviews=False, _prefix=None):
         """Cache key. This is the call signature of |find_mice|"""
-        return "subsys:{}:{}:{}:{}:{}".format(
+        key = "subsys:{}:{}:{}:{}:{}".format(
             self.subsystem_hash, _prefix, direction, mechanism, purviews)
+        # Keep MICE computed with an approximate measure apart.
+        if config.MEASURE != 'EMD':
+            key += ':' + config.MEASURE
+        return key
 
 
 class DictMiceCache(DictCache):
@@ -364,7 +369,7 @@ class DictMiceCache(DictCache):
         or splits the connections between the purview and mechanism
         """
         for key, mice in parent_cache.cache.items():
-            if not mice.damaged_by_cut(self.subsystem):
+            if not self.subsystem.mice_damaged_by_cut(mice):
                 self.cache[key] = mice
 
     def set(self, key, mice):
@@ -387,7 +392,11 @@ class DictMiceCache(DictCache):
 
     def key(self, direction, mechanism, purviews=False, _prefix=None):
         """Cache key. This is the call signature of |find_mice|"""
-        return (_prefix, direction, mechanism, purviews)
+        key = (_prefix, direction, mechanism, purviews)
+        # Keep MICE computed with an approximate measure apart.
+        if config.MEASURE != 'EMD':
+            key += (config.MEASURE,)
+        return key
 
 
 def MiceCache(subsystem, parent_cache=None):
@@ -420,6 +429,20 @@ class PurviewCache(DictCache):
             self.cache[key] = value
 
 
+class NodeTpmCache(DictCache):
+    """A network-level cache for the TPMs of nodes."""
+
+    def set(self, key, value):
+        """Only set if memory is not too full."""
+        if not memory_full():
+            self.cache[key] = value
+
+
+class MacroPipelineCache(NodeTpmCache):
+    """A network-level cache for the outputs of the stages of the
+    |MacroSubsystem| pipeline."""
+
+
 def method(cache_name, key_prefix=None):
     """Caching decorator for object-level method caches.
 
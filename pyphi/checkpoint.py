@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# checkpoint.py
+
+"""
+A checkpoint store for resuming long |big_phi| computations.
+
+When ``config.CHECKPOINT_RESULTS`` is enabled, every cut evaluated while
+searching for the MIP of a subsystem is recorded along with its |big_phi|
+value, and every finished |BigMip| is recorded when the search completes.
+Restarting the same computation (*e.g.* after a preemptible batch job is
+killed) then skips all finished subsystems and cuts.
+
+Checkpoints are stored on the local filesystem, in
+``config.CHECKPOINT_DIRECTORY``, with one subdirectory per subsystem. Every
+record is written to a temporary file which is then atomically renamed into
+place, so an interrupted write never leaves a corrupted checkpoint behind.
+Finished cuts are written in batches, at most every
+``config.CHECKPOINT_INTERVAL`` seconds and when the search for the MIP stops,
+so at most that much work is lost if the process is killed.
+
+.. note::
+
+    Subsystems are identified by their hash and ``config.MEASURE``; otherwise
+    checkpoints do not depend on the configuration. Remove the checkpoint
+    directory before resuming a computation with different settings.
+"""
+
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+import uuid
+from time import time
+
+from . import config, constants
+
+# Create a logger for this module.
+log = logging.getLogger(__name__)
+
+_BIG_MIP_FILENAME = 'big_mip.pickle'
+_CUTS_DIRECTORY = 'cuts'
+
+
+def _atomic_write(path, obj):
+    """Pickle an object to ``path`` so that the file is either complete or
+    absent, even if the process is killed while writing."""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(obj, f, protocol=constants.PICKLE_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _read(path):
+    """Unpickle the object at ``path``, or return ``None`` if there is no
+    readable object there."""
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+class Checkpoint:
+    """The checkpoint records of a single subsystem.
+
+    Args:
+        subsystem (|Subsystem|): The subsystem whose progress is recorded.
+
+    Keyword Args:
+        directory (str): The root directory of the checkpoint store. Defaults
+            to ``config.CHECKPOINT_DIRECTORY``.
+    """
+
+    def __init__(self, subsystem, directory=None):
+        directory = directory or config.CHECKPOINT_DIRECTORY
+        # Hashes of subsystems are stable across processes; mask off the sign
+        # to get a valid directory name.
+        key = '{:016x}'.format(hash(subsystem) & 0xffffffffffffffff)
+        # Keep results computed with an approximate measure apart.
+        if config.MEASURE != 'EMD':
+            key += '-' + config.MEASURE.lower()
+        self.path = os.path.join(directory, key)
+        self.cuts_path = os.path.join(self.path, _CUTS_DIRECTORY)
+        # Finished cuts which have not been written yet.
+        self._pending = {}
+        self._last_write = time()
+
+    def finished_cuts(self):
+        """Return a dictionary mapping every recorded |Cut| to its |big_phi|
+        value."""
+        finished = {}
+        if os.path.isdir(self.cuts_path):
+            for filename in os.listdir(self.cuts_path):
+                if not filename.startswith('.'):
+                    finished.update(
+                        _read(os.path.join(self.cuts_path, filename)) or {})
+        finished.update(self._pending)
+        return finished
+
+    def save_cut(self, cut, phi):
+        """Record the |big_phi| value of a finished cut.
+
+        The record is written along with the other pending ones if
+        ``config.CHECKPOINT_INTERVAL`` seconds have passed since the last
+        write.
+        """
+        self._pending[cut] = phi
+        if time() - self._last_write >= config.CHECKPOINT_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Write the pending records of finished cuts as one batch."""
+        if self._pending:
+            os.makedirs(self.cuts_path, exist_ok=True)
+            filename = '{}.pickle'.format(uuid.uuid4().hex)
+            _atomic_write(os.path.join(self.cuts_path, filename),
+                          self._pending)
+            self._pending = {}
+        self._last_write = time()
+
+    def big_mip(self):
+        """Return the recorded |BigMip|, or ``None`` if the subsystem has not
+        finished."""
+        return _read(os.path.join(self.path, _BIG_MIP_FILENAME))
+
+    def save_big_mip(self, big_mip):
+        """Record the finished |BigMip|.
+
+        The records of individual cuts are no longer needed once the subsystem
+        has finished, so they are removed.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        _atomic_write(os.path.join(self.path, _BIG_MIP_FILENAME), big_mip)
+        shutil.rmtree(self.cuts_path, ignore_errors=True)
+        self._pending = {}
+
+
+def for_subsystem(subsystem):
+    """Return the |Checkpoint| of a subsystem, or ``None`` if checkpointing
+    is disabled."""
+    if not config.CHECKPOINT_RESULTS:
+        return None
+    return Checkpoint(subsystem)
+
+
+def clear(directory=None):
+    """Remove all checkpoints.
+
+    Keyword Args:
+        directory (str): The root directory of the checkpoint store. Defaults
+            to ``config.CHECKPOINT_DIRECTORY``.
+    """
+    shutil.rmtree(directory or config.CHECKPOINT_DIRECTORY,
+                  ignore_errors=True)
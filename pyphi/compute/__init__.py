@@ -20,11 +20,13 @@ Attributes:
     evaluate_cut: Alias for :func:`big_phi.evaluate_cut`.
     main_complex: Alias for :func:`big_phi.main_complex`.
     possible_complexes: Alias for :func:`big_phi.possible_complexes`.
+    screen_main_complexes: Alias for :func:`big_phi.screen_main_complexes`.
+    stream_complexes: Alias for :func:`big_phi.stream_complexes`.
     subsystems: Alias for :func:`big_phi.subsystems`.
 """
 
 from .big_phi import (all_complexes, big_mip, big_phi, complexes, condensed,
                       evaluate_cut, main_complex, possible_complexes,
-                      subsystems)
+                      screen_main_complexes, stream_complexes, subsystems)
 from .concept import concept, conceptual_information, constellation
 from .distance import concept_distance, constellation_distance
@@ -9,13 +9,16 @@ subsystems.
 
 import functools
 import logging
-import multiprocessing
+import zlib
+from collections import namedtuple
 from time import time
 
 from . import parallel
 from .concept import constellation
-from .distance import constellation_distance
-from .. import config, exceptions, memory, utils, validate
+from .progress import ProgressTracker
+from .distance import constellation_distance, precompute_distances
+from .transport import WarmStart
+from .. import checkpoint, config, memory, symmetry, utils, validate
 from ..models import BigMip, Cut, _null_bigmip, _single_node_bigmip
 from ..subsystem import Subsystem
 
@@ -24,7 +27,8 @@ log = logging.getLogger(__name__)
 
 
 # Expose `compute.evaluate_cut` to public API
-def evaluate_cut(uncut_subsystem, cut, unpartitioned_constellation):
+def evaluate_cut(uncut_subsystem, cut, unpartitioned_constellation,
+                 warm_start=None):
     """Find the |BigMip| for a given cut.
 
     Args:
@@ -33,6 +37,11 @@ def evaluate_cut(uncut_subsystem, cut, unpartitioned_constellation):
         unpartitioned_constellation (|Constellation|): The constellation of the
             uncut subsystem.
 
+    Keyword Args:
+        warm_start (WarmStart): The state used to warm-start the
+            ``'transport'`` EMD solver, shared by the cuts of a subsystem (see
+            :mod:`~pyphi.compute.transport`).
+
     Returns:
         |BigMip|: The |BigMip| for that cut.
     """
@@ -60,93 +69,142 @@ def evaluate_cut(uncut_subsystem, cut, unpartitioned_constellation):
     log.debug("Finished evaluating cut {}.".format(cut))
 
     phi = constellation_distance(unpartitioned_constellation,
-                                 partitioned_constellation)
+                                 partitioned_constellation, warm_start)
 
     return BigMip(
         phi=round(phi, config.PRECISION),
         unpartitioned_constellation=unpartitioned_constellation,
         partitioned_constellation=partitioned_constellation,
         subsystem=uncut_subsystem,
-        cut_subsystem=cut_subsystem)
-
+        cut_subsystem=cut_subsystem,
+        unique=(symmetry.unique_mice(unpartitioned_constellation) and
+                symmetry.unique_mice(partitioned_constellation)))
 
-# Wrapper for `evaluate_cut` for parallel processing.
-def _eval_wrapper(in_queue, out_queue, subsystem, unpartitioned_constellation):
-    while True:
-        cut = in_queue.get()
-        if cut is None:
-            break
-        new_mip = evaluate_cut(subsystem, cut, unpartitioned_constellation)
-        out_queue.put(new_mip)
-    out_queue.put(None)
 
+def _evaluate_cut_orbit(subsystem, cut, unpartitioned_constellation,
+                        automorphisms=(), warm_start=None):
+    """Find the minimal |BigMip| over the orbit of a cut under a group of
+    automorphisms of the subsystem.
 
-def _find_mip_parallel(subsystem, cuts, unpartitioned_constellation, min_mip):
+    The cuts of an orbit give the same |big_phi| if the MICE of the
+    constellations are ``unique`` (see |Mice|), so the other cuts of the orbit
+    are only evaluated if the |BigMip| of ``cut`` is not ``unique``.
+    """
+    mip = evaluate_cut(subsystem, cut, unpartitioned_constellation,
+                       warm_start)
+    if mip.unique or not automorphisms:
+        return mip
+    for other in symmetry.cut_orbit(cut, automorphisms)[1:]:
+        other_mip = evaluate_cut(subsystem, other, unpartitioned_constellation,
+                                 warm_start)
+        if other_mip < mip:
+            mip = other_mip
+    mip.unique = False
+    return mip
+
+
+# The result of evaluating a cut in summary mode: just the cut, its phi, and
+# whether it is unique.
+_CutSummary = namedtuple('_CutSummary', ['phi', 'cut', 'unique'])
+
+
+# Wrapper for `evaluate_cut` for parallel processing. Returns the cut that
+# was evaluated along with the result, since the minimal cut of its orbit may
+# be a different one.
+def _eval_wrapper(cut, subsystem, unpartitioned_constellation, summarize,
+                  automorphisms, warm_start):
+    new_mip = _evaluate_cut_orbit(subsystem, cut, unpartitioned_constellation,
+                                  automorphisms, warm_start)
+    if summarize:
+        return cut, _CutSummary(new_mip.phi, new_mip.cut, new_mip.unique)
+    return cut, new_mip
+
+
+def _find_mip_parallel(subsystem, cuts, unpartitioned_constellation, min_mip,
+                       checkpoint=None, automorphisms=()):
     """Find the MIP for a subsystem with a parallel loop over all cuts.
 
-    Uses the specified number of cores.
+    Uses the specified number of cores. If a |Checkpoint| is given, the
+    |big_phi| value of every finished cut is recorded in it. If
+    ``automorphisms`` of the subsystem are given, each cut stands for its
+    orbit under them (see :func:`big_mip_bipartitions`).
+
+    If ``config.SUMMARIZE_CUT_EVALUATION`` is enabled, workers only send back
+    the |big_phi| value of each cut, and the |BigMip| of the minimal cut is
+    recomputed once at the end.
     """
-    number_of_processes = parallel.get_num_processes()
-    # Define input and output queues to allow short-circuit if a cut if found
-    # with zero Phi. Load the input queue with all possible cuts and a 'poison
-    # pill' for each process.
-    in_queue = multiprocessing.Queue()
-    out_queue = multiprocessing.Queue()
-    for cut in cuts:
-        in_queue.put(cut)
-    for i in range(number_of_processes):
-        in_queue.put(None)
-    # Initialize the processes and start them.
-    processes = [
-        multiprocessing.Process(target=_eval_wrapper,
-                                args=(in_queue, out_queue, subsystem,
-                                      unpartitioned_constellation))
-        for i in range(number_of_processes)
-    ]
-    for i in range(number_of_processes):
-        processes[i].start()
-    # Continue to process output queue until all processes have completed, or a
-    # 'poison pill' has been returned.
-    while True:
-        new_mip = out_queue.get()
-        if new_mip is None:
-            number_of_processes -= 1
-            if number_of_processes == 0:
-                break
-        elif new_mip.phi == 0:
+    # Each worker gets its own copy of the warm-start state.
+    args = (subsystem, unpartitioned_constellation,
+            config.SUMMARIZE_CUT_EVALUATION, automorphisms, WarmStart())
+    unique = True
+    # Stop the workers as soon as a cut with zero Phi is found.
+    for cut, new_mip in parallel.imap_chunked(_eval_wrapper, cuts,
+                                              args=args):
+        # Record the cut that was evaluated, which is the one looked up when
+        # resuming, rather than the minimal cut of its orbit.
+        if checkpoint is not None:
+            checkpoint.save_cut(cut, new_mip.phi)
+        unique = unique and new_mip.unique
+        if new_mip.phi == 0:
             min_mip = new_mip
-            for process in processes:
-                process.terminate()
             break
-        elif new_mip < min_mip:
+        # MIPs of the same subsystem are ordered by phi alone.
+        elif new_mip.phi < min_mip.phi:
             min_mip = new_mip
+
+    if isinstance(min_mip, _CutSummary):
+        log.debug("Rebuilding the MIP for cut {}.".format(min_mip.cut))
+        min_mip = evaluate_cut(subsystem, min_mip.cut,
+                               unpartitioned_constellation)
+    min_mip.unique = unique
     return min_mip
 
 
 def _find_mip_sequential(subsystem, cuts, unpartitioned_constellation,
-                         min_mip):
+                         min_mip, checkpoint=None, automorphisms=()):
     """Find the minimal cut for a subsystem by sequentially loop over all cuts.
 
-    Holds only two |BigMip|s in memory at once.
+    Holds only two |BigMip|s in memory at once. If a |Checkpoint| is given,
+    the |big_phi| value of every finished cut is recorded in it. If
+    ``automorphisms`` of the subsystem are given, each cut stands for its
+    orbit under them (see :func:`big_mip_bipartitions`).
     """
+    unique = True
+    warm_start = WarmStart()
     for i, cut in enumerate(cuts):
-        new_mip = evaluate_cut(subsystem, cut, unpartitioned_constellation)
+        new_mip = _evaluate_cut_orbit(subsystem, cut,
+                                      unpartitioned_constellation,
+                                      automorphisms, warm_start)
         log.debug("Finished {} of {} cuts.".format(i + 1, len(cuts)))
+        if checkpoint is not None:
+            checkpoint.save_cut(cut, new_mip.phi)
+        unique = unique and new_mip.unique
         if new_mip < min_mip:
             min_mip = new_mip
         # Short-circuit as soon as we find a MIP with effectively 0 phi.
         if min_mip.phi == 0:
             break
+    min_mip.unique = unique
     return min_mip
 
 
-def big_mip_bipartitions(nodes):
+def big_mip_bipartitions(nodes, automorphisms=()):
     """Return all |big_phi| cuts for the given nodes.
 
     This value changes based on `config.CUT_ONE_APPROXIMATION`.
 
     Args:
         nodes (tuple[int]): The node indices to partition.
+
+    Keyword Args:
+        automorphisms (list[tuple[int]]): Permutations generating a group of
+            automorphisms of the subsystem (see
+            :meth:`~pyphi.subsystem.Subsystem.automorphisms`). If given, only
+            the first cut of each orbit under the group is returned. The
+            other cuts of the orbit give the same |big_phi| unless there are
+            ties between purviews, in which case the MIP search evaluates them
+            too.
+
     Returns:
         list[|Cut|]: All unidirectional partitions.
     """
@@ -156,8 +214,52 @@ def big_mip_bipartitions(nodes):
         # Skip the first and last (trivial, null cut) bipartitions
         bipartitions = utils.directed_bipartition(nodes)[1:-1]
 
-    return [Cut(bipartition[0], bipartition[1])
+    cuts = [Cut(bipartition[0], bipartition[1])
             for bipartition in bipartitions]
+    if automorphisms:
+        cuts = symmetry.cut_representatives(cuts, automorphisms)
+    return cuts
+
+
+def _resume_find_mip(find_mip, subsystem, cuts, unpartitioned_constellation,
+                     min_mip, checkpoint_, automorphisms=()):
+    """Find the MIP with ``find_mip``, skipping the cuts that are already
+    recorded in the checkpoint.
+
+    Only the |big_phi| values of recorded cuts are stored, so the |BigMip| of
+    the best recorded cut is recomputed if it turns out to be the MIP.
+    """
+    if checkpoint_ is None:
+        return find_mip(subsystem, cuts, unpartitioned_constellation, min_mip,
+                        automorphisms=automorphisms)
+
+    finished = checkpoint_.finished_cuts()
+    remaining = [cut for cut in cuts if cut not in finished]
+    best_cut = min((cut for cut in cuts if cut in finished),
+                   key=finished.get, default=None)
+    log.info('Resuming from checkpoint: {} of {} cuts already '
+             'finished.'.format(len(cuts) - len(remaining), len(cuts)))
+
+    # Only search the remaining cuts if the recorded ones didn't short-circuit.
+    if remaining and (best_cut is None or finished[best_cut] != 0):
+        try:
+            min_mip = find_mip(subsystem, remaining,
+                               unpartitioned_constellation, min_mip,
+                               checkpoint=checkpoint_,
+                               automorphisms=automorphisms)
+        finally:
+            # Write the cuts finished since the last batch, even if the
+            # search was interrupted.
+            checkpoint_.flush()
+
+    if best_cut is not None and finished[best_cut] < min_mip.phi:
+        min_mip = _evaluate_cut_orbit(subsystem, best_cut,
+                                      unpartitioned_constellation,
+                                      automorphisms)
+    # Whether the recorded cuts were unique is not known.
+    if best_cut is not None:
+        min_mip.unique = False
+    return min_mip
 
 
 # TODO document big_mip
@@ -173,6 +275,14 @@ def _big_mip(cache_key, subsystem):
         intermediate calculations. The top level contains the basic MIP
         information for the given subsystem.
     """
+    checkpoint_ = checkpoint.for_subsystem(subsystem)
+    if checkpoint_ is not None:
+        restored = checkpoint_.big_mip()
+        if restored is not None:
+            log.info('Restored finished big-phi data for {} from '
+                     'checkpoint.'.format(subsystem))
+            return restored
+
     log.info("Calculating big-phi data for {}...".format(subsystem))
     start = time()
 
@@ -188,11 +298,17 @@ def _big_mip(cache_key, subsystem):
         big_mip.small_phi_time = round(small_phi_time, config.PRECISION)
         return big_mip
 
+    # The MIP of a subsystem in one of the degenerate cases below is the same
+    # for every subsystem symmetric to it.
+    def degenerate(big_mip):
+        big_mip.unique = True
+        return time_annotated(big_mip)
+
     # Special case for single-node subsystems.
     if len(subsystem) == 1:
         log.info('Single-node {}; returning the hard-coded single-node MIP '
                  'immediately.'.format(subsystem))
-        return time_annotated(_single_node_bigmip(subsystem))
+        return degenerate(_single_node_bigmip(subsystem))
 
     # Check for degenerate cases
     # =========================================================================
@@ -204,12 +320,12 @@ def _big_mip(cache_key, subsystem):
     if not subsystem:
         log.info('Subsystem {} is empty; returning null MIP '
                  'immediately.'.format(subsystem))
-        return time_annotated(_null_bigmip(subsystem))
+        return degenerate(_null_bigmip(subsystem))
 
-    if not utils.strongly_connected(subsystem.cm, subsystem.node_indices):
+    if not subsystem.strongly_connected():
         log.info('{} is not strongly connected; returning null MIP '
                  'immediately.'.format(subsystem))
-        return time_annotated(_null_bigmip(subsystem))
+        return degenerate(_null_bigmip(subsystem))
     # =========================================================================
 
     log.debug("Finding unpartitioned constellation...")
@@ -221,27 +337,52 @@ def _big_mip(cache_key, subsystem):
     if not unpartitioned_constellation:
         # Short-circuit if there are no concepts in the unpartitioned
         # constellation.
-        result = time_annotated(_null_bigmip(subsystem))
+        result = degenerate(_null_bigmip(subsystem))
     else:
-        cuts = big_mip_bipartitions(subsystem.cut_indices)
+        # The unpartitioned concepts are compared against the partitioned
+        # constellation of every cut, so compute what they need up front.
+        precompute_distances(unpartitioned_constellation)
+        # Symmetric cuts can only be skipped if the MICE of the unpartitioned
+        # constellation don't depend on the order of the purviews.
+        if (config.EXPLOIT_SYMMETRY and
+                symmetry.unique_mice(unpartitioned_constellation)):
+            automorphisms = subsystem.automorphisms()
+        else:
+            automorphisms = ()
+        cuts = big_mip_bipartitions(subsystem.cut_indices, automorphisms)
         min_mip = _null_bigmip(subsystem)
         min_mip.phi = float('inf')
-        min_mip = _find_mip(subsystem, cuts, unpartitioned_constellation,
-                            min_mip)
+        min_mip = _resume_find_mip(_find_mip, subsystem, cuts,
+                                   unpartitioned_constellation, min_mip,
+                                   checkpoint_, automorphisms)
         result = time_annotated(min_mip, small_phi_time)
 
     log.info("Finished calculating big-phi data for {}.".format(subsystem))
     log.debug("RESULT: \n" + str(result))
 
+    if checkpoint_ is not None:
+        checkpoint_.save_big_mip(result)
+
     return result
 
 
-# Wrapper to ensure that the cache key is the native hash of the subsystem, so
-# joblib doesn't mistakenly recompute things when the subsystem's MICE cache is
-# changed.
+def _cache_key(subsystem):
+    """Return the key under which the |BigMip| of a subsystem is cached.
+
+    This is the native hash of the subsystem, so the cache doesn't mistakenly
+    recompute things when the subsystem's MICE cache is changed. Results
+    computed with an approximate ``config.MEASURE`` are kept apart from exact
+    ones.
+    """
+    if config.MEASURE == 'EMD':
+        return hash(subsystem)
+    # String hashes are randomized per process; use a stable checksum.
+    return hash((subsystem, zlib.crc32(config.MEASURE.encode())))
+
+
 @functools.wraps(_big_mip)
 def big_mip(subsystem):
-    return _big_mip(hash(subsystem), subsystem)
+    return _big_mip(_cache_key(subsystem), subsystem)
 
 
 def big_phi(subsystem):
@@ -249,6 +390,36 @@ def big_phi(subsystem):
     return big_mip(subsystem).phi
 
 
+def _reachable(network, state, subsets):
+    """Return whether the network's state is reachable for the subsystem over
+    each of the given subsets of nodes.
+
+    This is the check done by :func:`~pyphi.validate.state_reachable` when a
+    |Subsystem| is created (see :meth:`~pyphi.network.Network.state_reachable`).
+    """
+    if not config.VALIDATE_SUBSYSTEM_STATES:
+        return [True] * len(subsets)
+    return [network.state_reachable(state, subset) for subset in subsets]
+
+
+def _subsystems(network, state, subsets):
+    """Yield the subsystems of the network over each of the given subsets of
+    nodes, skipping those in an unreachable state.
+
+    The reachability of each subset is checked against the network's cached
+    reachability bitsets before the |Subsystem| is created, so it isn't
+    checked again by the constructor. Subsystems are cheap to create; the
+    TPMs of their nodes are only generated when they are first needed.
+    """
+    subsets = list(subsets)
+    for subset, reachable in zip(subsets,
+                                 _reachable(network, state, subsets)):
+        if reachable:
+            with config.override(VALIDATE_SUBSYSTEM_STATES=False):
+                subsystem = Subsystem(network, state, subset)
+            yield subsystem
+
+
 def subsystems(network, state):
     """Return a generator of all **possible** subsystems of a network.
 
@@ -256,11 +427,7 @@ def subsystems(network, state):
     """
     validate.is_network(network)
 
-    for subset in utils.powerset(network.node_indices):
-        try:
-            yield Subsystem(network, state, subset)
-        except exceptions.StateUnreachableError:
-            pass
+    return _subsystems(network, state, utils.powerset(network.node_indices))
 
 
 def all_complexes(network, state):
@@ -280,7 +447,8 @@ def possible_complexes(network, state):
     complex, because they do not have a causal link with the rest of the
     subsystem in the past or future, respectively).
 
-    Does not include subsystems in an impossible state.
+    Does not include subsystems in an impossible state, or subsystems which
+    are not strongly connected, since their |big_phi| is necessarily zero.
 
     Args:
         network (Network): The network for which to return possible complexes.
@@ -293,22 +461,88 @@ def possible_complexes(network, state):
 
     causally_significant_nodes = utils.causally_significant_nodes(network.cm)
 
-    for subset in utils.powerset(causally_significant_nodes):
-        # Don't return empty system
-        if len(subset) == 0:
-            continue
+    # Don't return empty system
+    subsets = (subset for subset in utils.powerset(causally_significant_nodes)
+               if len(subset) > 0 and network.strongly_connected(subset))
 
-        # Don't return subsystems that are in an impossible state.
-        try:
-            yield Subsystem(network, state, subset)
-        except exceptions.StateUnreachableError:
-            continue
+    return _subsystems(network, state, subsets)
+
+
+def _symmetric_big_mips(network, state, candidates):
+    """Yield the |BigMip| of each candidate subsystem, computing only one per
+    orbit of candidates under the automorphisms of the network (see
+    :mod:`pyphi.symmetry`).
+
+    The |BigMip| of a representative is only permuted to get those of the
+    rest of its orbit if it is ``unique``; otherwise tied purviews could make
+    their |big_phi| differ, so they are computed too.
+    """
+    candidates = list(candidates)
+    generators = symmetry.automorphisms(network.tpm, network.cm, state)
+    orbits = symmetry.orbits((c.node_indices for c in candidates), generators,
+                             network.size)
+    representatives = {}
+    for subsystem in candidates:
+        representative, perm = orbits[subsystem.node_indices]
+        if representative == subsystem.node_indices:
+            mip = big_mip(subsystem)
+            representatives[representative] = mip
+            yield mip
+        elif getattr(representatives[representative], 'unique', False):
+            yield symmetry.permute_big_mip(
+                perm, representatives[representative], subsystem)
+        else:
+            yield big_mip(subsystem)
 
 
 def complexes(network, state):
-    """Return a generator for all irreducible complexes of the network."""
-    return tuple(filter(None, (big_mip(subsystem) for subsystem in
-                               possible_complexes(network, state))))
+    """Return a generator for all irreducible complexes of the network.
+
+    If ``config.EXPLOIT_SYMMETRY`` is enabled, the |BigMip| of only one
+    candidate per orbit under the automorphisms of the network is computed,
+    unless its constellations have tied purviews.
+    """
+    candidates = possible_complexes(network, state)
+    if config.EXPLOIT_SYMMETRY:
+        mips = _symmetric_big_mips(network, state, candidates)
+    else:
+        mips = (big_mip(subsystem) for subsystem in candidates)
+    return tuple(filter(None, mips))
+
+
+def stream_complexes(network, state):
+    """Return a generator which computes the |BigMip| of every possible
+    complex of the network, yielding each one as soon as it is finished.
+
+    This is useful for long-running computations: progress can be monitored,
+    partial results can be saved, and the computation can be stopped early
+    simply by no longer consuming the generator.
+
+    Reducible candidates are yielded too; use ``filter(None, ...)`` on the
+    |BigMip| objects to keep only the irreducible complexes.
+
+    Args:
+        network (Network): The network for which to compute complexes.
+        state (tuple[int]): The state of the network.
+
+    Yields:
+        tuple[|BigMip|, |Progress|]: The |BigMip| of the next candidate
+        subsystem, and the progress of the computation so far. The ``best``
+        attribute of the progress is the |BigMip| with maximal |big_phi| found
+        so far (*i.e.*, the current main complex).
+
+    .. note::
+        Candidates are evaluated in order of increasing size, so the
+        estimated time remaining will tend to be too optimistic.
+    """
+    candidates = list(possible_complexes(network, state))
+    tracker = ProgressTracker(len(candidates))
+
+    for subsystem in candidates:
+        mip = big_mip(subsystem)
+        progress = tracker.update(mip)
+        log.info("Finished complex {}: {}".format(subsystem, progress))
+        yield mip, progress
 
 
 def main_complex(network, state):
@@ -328,6 +562,66 @@ def main_complex(network, state):
     return result
 
 
+def screen_main_complexes(candidates, measure='SLICED_EMD', threshold=None,
+                          top=None):
+    """Find the main complexes of many systems, screening them with an
+    approximate measure first.
+
+    The main complex of every candidate is first computed with the repertoire
+    distance set to the fast, approximate ``measure`` (see
+    :mod:`pyphi.measures`). Only the candidates which pass the screen are then
+    confirmed by computing their main complex with the configured
+    ``config.MEASURE``.
+
+    Args:
+        candidates (Iterable[tuple[Network, tuple[int]]]): The ``(network,
+            state)`` pairs to screen.
+
+    Keyword Args:
+        measure (str): The approximate measure to screen with.
+        threshold (float): Confirm the candidates whose approximate |big_phi|
+            is greater than this.
+        top (int): Confirm the candidates with the ``top`` greatest
+            approximate |big_phi| values.
+
+    If neither ``threshold`` nor ``top`` is given, every candidate with
+    positive approximate |big_phi| is confirmed. If both are given, the
+    candidates which pass either screen are confirmed.
+
+    Returns:
+        list[tuple[|BigMip|, |BigMip|]]: For each candidate, in order, the
+        approximate main complex and the confirmed main complex, which is
+        ``None`` if the candidate did not pass the screen.
+
+    .. note::
+        The approximate |big_phi| values are not bounds on the exact values,
+        so the screen can miss candidates which are close to the threshold.
+    """
+    candidates = list(candidates)
+
+    # Approximate results must not be stored in the shared MICE cache.
+    with config.override(MEASURE=measure, REDIS_CACHE=False):
+        screened = [main_complex(network, state)
+                    for network, state in candidates]
+    log.info("Screened {} candidates.".format(len(screened)))
+
+    if threshold is None and top is None:
+        threshold = 0
+    confirm = set()
+    if threshold is not None:
+        confirm.update(i for i, mip in enumerate(screened)
+                       if mip.phi > threshold)
+    if top is not None:
+        ranked = sorted(range(len(screened)), key=lambda i: screened[i].phi,
+                        reverse=True)
+        confirm.update(ranked[:top])
+
+    confirmed = [main_complex(*candidates[i]) if i in confirm else None
+                 for i in range(len(candidates))]
+    log.info("Confirmed {} candidates.".format(len(confirm)))
+    return list(zip(screened, confirmed))
+
+
 def condensed(network, state):
     """Return the set of maximal non-overlapping complexes."""
     condensed = []
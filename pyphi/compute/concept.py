@@ -2,7 +2,6 @@
 # -*- coding: utf-8 -*-
 # compute/concept.py
 
-import multiprocessing
 from time import time
 
 from . import parallel
@@ -55,53 +54,20 @@ def _sequential_constellation(subsystem, mechanisms, purviews=False,
     return models.Constellation(filter(None, concepts))
 
 
-def _concept_wrapper(in_queue, out_queue, subsystem, purviews=False,
-                     past_purviews=False, future_purviews=False):
-    """Wrapper for parallel evaluation of concepts."""
-    while True:
-        mechanism = in_queue.get()
-        if mechanism is None:
-            break
-        new_concept = concept(subsystem, mechanism, purviews=purviews,
-                              past_purviews=past_purviews,
-                              future_purviews=future_purviews)
-        if new_concept.phi > 0:
-            out_queue.put(new_concept)
-    out_queue.put(None)
+# Wrapper for `concept` for parallel processing.
+def _concept_wrapper(mechanism, subsystem, purviews, past_purviews,
+                     future_purviews):
+    return concept(subsystem, mechanism, purviews=purviews,
+                   past_purviews=past_purviews,
+                   future_purviews=future_purviews)
 
 
 def _parallel_constellation(subsystem, mechanisms, purviews=False,
                             past_purviews=False, future_purviews=False):
-
-    number_of_processes = parallel.get_num_processes()
-
-    # Define input and output queues and load the input queue with all possible
-    # cuts and a 'poison pill' for each process.
-    in_queue = multiprocessing.Queue()
-    out_queue = multiprocessing.Queue()
-    for mechanism in mechanisms:
-        in_queue.put(mechanism)
-    for i in range(number_of_processes):
-        in_queue.put(None)
-
-    # Initialize the processes and start them.
-    for i in range(number_of_processes):
-        args = (in_queue, out_queue, subsystem, purviews,
-                past_purviews, future_purviews)
-        process = multiprocessing.Process(target=_concept_wrapper, args=args)
-        process.start()
-
-    # Continue to process output queue until all processes have completed, or a
-    # 'poison pill' has been returned.
-    concepts = []
-    while True:
-        new_concept = out_queue.get()
-        if new_concept is None:
-            number_of_processes -= 1
-            if number_of_processes == 0:
-                break
-        else:
-            concepts.append(new_concept)
+    args = (subsystem, purviews, past_purviews, future_purviews)
+    # Filter out falsy concepts in the workers, so they aren't sent back.
+    concepts = parallel.imap_chunked(_concept_wrapper, mechanisms, args=args,
+                                     keep=bool)
     return models.Constellation(concepts)
 
 
@@ -2,9 +2,15 @@
 # -*- coding: utf-8 -*-
 # compute/distance.py
 
+import logging
+from collections import defaultdict
+
 import numpy as np
 
-from .. import utils
+from . import transport
+from .. import config, utils
+
+log = logging.getLogger(__name__)
 
 
 def concept_distance(c1, c2):
@@ -29,6 +35,134 @@ def concept_distance(c1, c2):
                           c2.expand_effect_repertoire(effect_purview))])
 
 
+def _effect_marginals(concept):
+    """Return the probability that each node is off, according to a concept's
+    effect repertoire expanded over the entire subsystem."""
+    repertoire = concept.expand_effect_repertoire()
+    return np.array([utils.marginal_zero(repertoire, i)
+                     for i in range(repertoire.ndim)])
+
+
+def _purview_indicators(concepts, size):
+    """Return a boolean matrix whose rows indicate the nodes in the effect
+    purview of each concept."""
+    indicators = np.zeros([len(concepts), size], dtype=bool)
+    for i, c in enumerate(concepts):
+        indicators[i, list(c.effect.purview)] = True
+    return indicators
+
+
+def concept_distance_matrix(C1, C2):
+    """Return the distances in concept-space between every concept in one
+    collection and every concept in another.
+
+    This gives the same result as calling :func:`concept_distance` on every
+    pair, but shares work between the pairs:
+
+    - Effect repertoires are products of independent distributions over each
+      node, so the EMD between them is the sum of the differences between the
+      marginal probabilities of each node in the union of their purviews
+      (see :func:`~pyphi.measures.sliced_emd`). Every concept's marginals
+      are computed once and the whole block of effect distances is computed
+      at once.
+    - Pairs of cause repertoires are grouped by the union of their purviews,
+      so that each concept's repertoire is expanded once per union and each
+      group shares the same Hamming matrix.
+
+    Args:
+        C1 (tuple[|Concept|]): The first collection of concepts.
+        C2 (tuple[|Concept|]): The second collection of concepts.
+
+    Returns:
+        np.ndarray: A matrix whose |i,jth| entry is the distance between the
+        |ith| concept of ``C1`` and the |jth| concept of ``C2``.
+    """
+    N, M = len(C1), len(C2)
+    if not N or not M:
+        return np.zeros([N, M])
+
+    marginals1 = np.array([_effect_marginals(c) for c in C1])
+    marginals2 = np.array([_effect_marginals(c) for c in C2])
+    # Only nodes in the union of the purviews count, since the unconstrained
+    # repertoires of the two concepts' subsystems can differ elsewhere.
+    purviews1 = _purview_indicators(C1, marginals1.shape[1])
+    purviews2 = _purview_indicators(C2, marginals2.shape[1])
+    union = purviews1[:, np.newaxis, :] | purviews2[np.newaxis, :, :]
+    effect_distances = (union * np.abs(
+        marginals1[:, np.newaxis, :] - marginals2[np.newaxis, :, :])).sum(2)
+
+    pairs_by_purview = defaultdict(list)
+    for i, c1 in enumerate(C1):
+        for j, c2 in enumerate(C2):
+            purview = frozenset(c1.cause.purview + c2.cause.purview)
+            pairs_by_purview[purview].append((i, j))
+
+    cause_distances = np.empty([N, M])
+    for purview, pairs in pairs_by_purview.items():
+        purview = tuple(purview)
+        hamming_matrix = utils._hamming_matrix(len(purview))
+        expanded1, expanded2 = {}, {}
+        for i, j in pairs:
+            if i not in expanded1:
+                expanded1[i] = C1[i].expand_cause_repertoire(purview).ravel()
+            if j not in expanded2:
+                expanded2[j] = C2[j].expand_cause_repertoire(purview).ravel()
+            d1, d2 = expanded1[i], expanded2[j]
+            if np.array_equal(d1, d2):
+                cause_distances[i, j] = 0.0
+            else:
+                cause_distances[i, j] = utils.emd(d1, d2, hamming_matrix)
+
+    return cause_distances + effect_distances
+
+
+def null_concept_distance(concept):
+    """Return the distance from a concept to the null concept of its
+    subsystem.
+
+    The distance is stored on the concept, so that it is only computed once
+    for concepts which are compared against many constellations (such as those
+    in the unpartitioned constellation, which is compared to the partitioned
+    constellation of every cut).
+
+    Args:
+        concept (|Concept|): The concept.
+
+    Returns:
+        float: The distance between the concept and the null concept.
+    """
+    if concept._null_concept_distance is None:
+        concept._null_concept_distance = concept_distance(
+            concept, concept.subsystem.null_concept)
+    return concept._null_concept_distance
+
+
+def precompute_distances(constellation):
+    """Compute the distance from each concept in a constellation to the null
+    concept, and their effect repertoires expanded over the entire subsystem.
+
+    This should be called on a constellation before it is sent to other
+    processes, so that the results are shared rather than recomputed by each.
+    """
+    for concept in constellation:
+        null_concept_distance(concept)
+        concept.expand_effect_repertoire()
+
+
+def _concepts_only_in(C1, C2):
+    """Return the concepts of ``C1`` that have no equal in ``C2`` in the
+    context of an EMD calculation.
+
+    Concepts are matched through a hash table of ``C2``, so only concepts with
+    the same hash are compared exactly.
+    """
+    index = defaultdict(list)
+    for c2 in C2:
+        index[c2.emd_hash()].append(c2)
+    return [c1 for c1 in C1
+            if not any(c1.emd_eq(c2) for c2 in index.get(c1.emd_hash(), ()))]
+
+
 def _constellation_distance_simple(C1, C2):
     """Return the distance between two constellations in concept-space.
 
@@ -38,21 +172,19 @@ def _constellation_distance_simple(C1, C2):
     # Make C1 refer to the bigger constellation.
     if len(C2) > len(C1):
         C1, C2 = C2, C1
-    destroyed = [c1 for c1 in C1 if not any(c1.emd_eq(c2) for c2 in C2)]
-    return sum(c.phi * concept_distance(c, c.subsystem.null_concept)
-               for c in destroyed)
+    destroyed = _concepts_only_in(C1, C2)
+    return sum(c.phi * null_concept_distance(c) for c in destroyed)
 
 
-def _constellation_distance_emd(unique_C1, unique_C2):
+def _constellation_distance_emd(unique_C1, unique_C2, warm_start=None):
     """Return the distance between two constellations in concept-space.
 
-    Uses the generalized EMD.
+    Uses the generalized EMD. ``warm_start`` is passed to
+    :func:`~pyphi.compute.transport.constellation_emd`.
     """
     # Get the pairwise distances between the concepts in the unpartitioned and
     # partitioned constellations.
-    distances = np.array([
-        [concept_distance(i, j) for j in unique_C2] for i in unique_C1
-    ])
+    distances = concept_distance_matrix(unique_C1, unique_C2)
     # We need distances from all concepts---in both the unpartitioned and
     # partitioned constellations---to the null concept, because:
     # - often a concept in the unpartitioned constellation is destroyed by a
@@ -61,9 +193,19 @@ def _constellation_distance_emd(unique_C1, unique_C2):
     #   small-phi, even though it has less big-phi, which means that some
     #   partitioned-constellation concepts will be moved to the null concept.
     distances_to_null = np.array([
-        concept_distance(c, c.subsystem.null_concept)
+        null_concept_distance(c)
         for constellation in (unique_C1, unique_C2) for c in constellation
     ])
+    if config.CONSTELLATION_EMD_SOLVER == 'transport':
+        try:
+            return transport.constellation_emd(unique_C1, unique_C2,
+                                               distances, distances_to_null,
+                                               warm_start)
+        except transport.IterationLimit as error:
+            log.warning('%s; falling back to pyemd.', error)
+    elif config.CONSTELLATION_EMD_SOLVER != 'pyemd':
+        raise ValueError('Invalid CONSTELLATION_EMD_SOLVER: {}'.format(
+            config.CONSTELLATION_EMD_SOLVER))
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
     # Now we make the distance matrix, which will look like this:
     #
@@ -110,27 +252,30 @@ def _constellation_distance_emd(unique_C1, unique_C2):
     # The sum of the two signatures should be the same.
     assert utils.phi_eq(sum(d1), sum(d2))
     # Calculate!
-    return utils.emd(np.array(d1), np.array(d2), distance_matrix)
+    return transport.pyemd_constellation_emd(np.array(d1), np.array(d2),
+                                             distance_matrix)
 
 
-def constellation_distance(C1, C2):
+def constellation_distance(C1, C2, warm_start=None):
     """Return the distance between two constellations in concept-space.
 
     Args:
         C1 (|Constellation|): The first constellation.
         C2 (|Constellation|): The second constellation.
 
+    Keyword Args:
+        warm_start (WarmStart): The state used to warm-start the
+            ``'transport'`` EMD solver (see :mod:`~pyphi.compute.transport`).
+
     Returns:
         float: The distance between the two constellations in concept-space.
     """
-    concepts_only_in_C1 = [
-        c1 for c1 in C1 if not any(c1.emd_eq(c2) for c2 in C2)]
-    concepts_only_in_C2 = [
-        c2 for c2 in C2 if not any(c2.emd_eq(c1) for c1 in C1)]
+    concepts_only_in_C1 = _concepts_only_in(C1, C2)
+    concepts_only_in_C2 = _concepts_only_in(C2, C1)
     # If the only difference in the constellations is that some concepts
     # disappeared, then we don't need to use the EMD.
     if not concepts_only_in_C1 or not concepts_only_in_C2:
         return _constellation_distance_simple(C1, C2)
     else:
         return _constellation_distance_emd(concepts_only_in_C1,
-                                           concepts_only_in_C2)
+                                           concepts_only_in_C2, warm_start)
@@ -3,6 +3,7 @@
 # compute/parallel.py
 
 import multiprocessing
+from time import time
 
 from .. import config
 
@@ -31,3 +32,138 @@ def get_num_processes():
         return num
 
     return config.NUMBER_OF_CORES
+
+
+class _ChunkSizer:
+    """Choose the size of the chunks of items sent to each worker.
+
+    If ``config.PARALLEL_CHUNK_SIZE`` is set, every chunk has that size.
+    Otherwise the size is adapted so that each chunk takes about
+    ``config.PARALLEL_CHUNK_TARGET_TIME`` seconds, based on the average time
+    per item measured so far. Chunks shrink towards the end of the items so
+    that the remaining work is still spread across all the workers.
+    """
+
+    def __init__(self, number_of_processes):
+        self.number_of_processes = number_of_processes
+        self.items = 0
+        self.elapsed = 0.0
+
+    def record(self, items, elapsed):
+        """Record that a chunk of ``items`` items took ``elapsed`` seconds."""
+        self.items += items
+        self.elapsed += elapsed
+
+    def size(self, remaining):
+        """Return the size of the next chunk, given the number of items that
+        have not been dispatched yet."""
+        if config.PARALLEL_CHUNK_SIZE:
+            return config.PARALLEL_CHUNK_SIZE
+        # Send single items until the cost of an item has been measured.
+        if not self.items:
+            return 1
+        cost = self.elapsed / self.items
+        if cost > 0:
+            size = int(config.PARALLEL_CHUNK_TARGET_TIME / cost)
+        else:
+            size = remaining
+        tail = remaining // (2 * self.number_of_processes)
+        return max(1, min(size, tail))
+
+
+def _chunk_worker(in_queue, out_queue, function, args, keep):
+    """Apply ``function`` to each chunk of items from ``in_queue``, putting the
+    results which satisfy ``keep``, the number of items and the time taken
+    back on ``out_queue`` as a batch."""
+    while True:
+        chunk = in_queue.get()
+        if chunk is None:
+            break
+        start = time()
+        try:
+            results = [function(item, *args) for item in chunk]
+            if keep is not None:
+                results = list(filter(keep, results))
+        except Exception as e:
+            out_queue.put(e)
+            break
+        out_queue.put((results, len(chunk), time() - start))
+
+
+def imap_chunked(function, items, args=(), keep=None):
+    """Apply a function to each item in parallel, yielding the results in
+    the order that they finish.
+
+    Items are sent to the workers in chunks and the results come back in
+    batches, to amortize the cost of communicating between processes. The
+    chunk sizes are controlled by ``config.PARALLEL_CHUNK_SIZE`` and
+    ``config.PARALLEL_CHUNK_TARGET_TIME``.
+
+    The workers are terminated if the generator is closed before all items
+    have been processed, so callers can stop early by breaking out of a loop
+    over the results.
+
+    Args:
+        function (function): The function to apply. It is called as
+            ``function(item, *args)``.
+        items (Iterable): The items to process.
+
+    Keyword Args:
+        args (tuple): Extra arguments passed to each call of ``function``.
+        keep (function): If given, only results for which ``keep`` returns
+            ``True`` are sent back from the workers and yielded. This saves
+            pickling results that would be discarded anyway.
+
+    Yields:
+        The result of ``function`` for each item.
+    """
+    items = list(items)
+    number_of_processes = get_num_processes()
+    sizer = _ChunkSizer(number_of_processes)
+
+    in_queue = multiprocessing.Queue()
+    out_queue = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=_chunk_worker,
+                                args=(in_queue, out_queue, function, args,
+                                      keep))
+        for i in range(number_of_processes)
+    ]
+    for process in processes:
+        process.start()
+
+    position = 0
+    outstanding = 0
+
+    def dispatch():
+        nonlocal position, outstanding
+        size = sizer.size(len(items) - position)
+        in_queue.put(items[position:position + size])
+        position += size
+        outstanding += 1
+
+    try:
+        # Keep two chunks queued for each worker so none of them go idle
+        # while waiting for the next chunk.
+        while position < len(items) and outstanding < 2 * number_of_processes:
+            dispatch()
+        while outstanding:
+            batch = out_queue.get()
+            if isinstance(batch, Exception):
+                raise batch
+            results, size, elapsed = batch
+            outstanding -= 1
+            sizer.record(size, elapsed)
+            if position < len(items):
+                dispatch()
+            yield from results
+        # Shut the workers down with a 'poison pill' for each one.
+        for process in processes:
+            in_queue.put(None)
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+                process.join()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# compute/progress.py
+
+"""
+Progress reporting for long-running computations over many candidates.
+"""
+
+from collections import namedtuple
+from time import time
+
+from .. import config
+
+
+class Progress(namedtuple('Progress', ['finished', 'total', 'elapsed',
+                                       'remaining', 'best'])):
+    """A snapshot of the progress of a computation.
+
+    Attributes:
+        finished (int): The number of candidates that have been evaluated.
+        total (int): The total number of candidates.
+        elapsed (float): The number of seconds since the computation started.
+        remaining (float): The estimated number of seconds until the
+            computation finishes, extrapolated from the average time per
+            candidate so far. This is ``None`` until the first candidate has
+            finished.
+        best: The best result found so far, or ``None`` if there is none.
+    """
+
+    __slots__ = ()
+
+    @property
+    def fraction(self):
+        """float: The fraction of candidates that have been evaluated."""
+        if not self.total:
+            return 1.0
+        return self.finished / self.total
+
+    def __str__(self):
+        remaining = ('?' if self.remaining is None else
+                     '{:.1f}s'.format(self.remaining))
+        return '{}/{} finished ({:.1%}), {:.1f}s elapsed, {} remaining'.format(
+            self.finished, self.total, self.fraction, self.elapsed, remaining)
+
+
+class ProgressTracker:
+    """Keep track of the progress of a computation over a known number of
+    candidates, along with the best result so far.
+
+    Args:
+        total (int): The number of candidates that will be evaluated.
+
+    Keyword Args:
+        key (function): Results are compared by ``key(result)`` when updating
+            the best result. Defaults to comparing the results themselves.
+    """
+
+    def __init__(self, total, key=None):
+        self.total = total
+        self.key = key or (lambda result: result)
+        self.finished = 0
+        self.best = None
+        self.start = time()
+
+    def update(self, result=None):
+        """Record that another candidate has finished.
+
+        Keyword Args:
+            result: The result for the candidate. If ``None``, only the count
+                of finished candidates is updated.
+
+        Returns:
+            Progress: The progress after this update.
+        """
+        self.finished += 1
+        if result is not None and (self.best is None or
+                                   self.key(result) > self.key(self.best)):
+            self.best = result
+        return self.progress()
+
+    def progress(self):
+        """Return the current |Progress|."""
+        elapsed = time() - self.start
+        if self.finished:
+            remaining = elapsed / self.finished * (self.total - self.finished)
+            remaining = round(remaining, config.PRECISION)
+        else:
+            remaining = None
+        return Progress(self.finished, self.total,
+                        round(elapsed, config.PRECISION), remaining, self.best)
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# compute/transport.py
+
+"""
+A transportation-problem solver for the constellation-level EMD.
+
+The generalized EMD between two constellations (see
+:func:`~pyphi.compute.distance.constellation_distance`) is a transport problem
+with a special structure: |small_phi| only ever moves from a concept of one
+constellation to a concept of the other, or between a concept and the null
+concept. So instead of solving the full square problem over every concept and
+the null concept, this module solves the rectangular problem from the concepts
+of the first constellation (plus the null concept, if the second constellation
+has more |small_phi|) to the concepts of the second (plus the null concept
+otherwise).
+
+The problem is solved with the transportation simplex method. The
+constellations compared for neighbouring cuts of the same subsystem are very
+similar, so the optimal basis of the previous problem, keyed by the mechanisms
+of the concepts, is used to build the initial solution of the next one. The
+basis is kept in a :class:`WarmStart` object, which the search for the MIP of
+a subsystem creates and passes along with each cut it evaluates.
+
+Entering cells are chosen by Dantzig's rule (most negative reduced cost) until
+a degenerate pivot occurs, after which Bland's rule is used so the method
+cannot cycle. If it still takes too many iterations, :class:`IterationLimit`
+is raised and the caller falls back to pyemd.
+
+The solver is used when ``config.CONSTELLATION_EMD_SOLVER`` is set to
+``'transport'``. The time taken by each solver is recorded (per process), and
+can be compared with :func:`timings`.
+"""
+
+from collections import defaultdict
+from time import time
+
+import numpy as np
+
+from .. import utils
+
+#: Label of the null concept in warm-start bases.
+NULL = 'null'
+
+# Tolerance for treating amounts of flow and reduced costs as zero.
+_TOLERANCE = 1e-12
+
+# Solver name -> [number of solves, total seconds, total simplex iterations].
+_timings = defaultdict(lambda: [0, 0.0, 0])
+
+
+class IterationLimit(RuntimeError):
+    """Raised when the transportation simplex exceeds its iteration limit."""
+
+
+class WarmStart:
+    """The optimal basis of the last problem solved with
+    :func:`constellation_emd`, used to build the initial solution of the next
+    one.
+
+    Attributes:
+        basis (set[tuple]): The basic cells, as pairs of the labels of their
+            row and column.
+    """
+
+    def __init__(self):
+        self.basis = set()
+
+
+def timings():
+    """Return the time spent in each constellation EMD solver in this process.
+
+    Returns:
+        dict: A dictionary mapping the name of each solver that has been used
+        to a tuple of the number of problems it solved, the total number of
+        seconds it took, and the total number of simplex iterations (always
+        zero for ``'pyemd'``).
+    """
+    return {solver: tuple(timing) for solver, timing in _timings.items()}
+
+
+def reset_timings():
+    """Clear the recorded solver timings."""
+    _timings.clear()
+
+
+def record_timing(solver, elapsed, iterations=0):
+    """Record that ``solver`` solved a problem in ``elapsed`` seconds."""
+    timing = _timings[solver]
+    timing[0] += 1
+    timing[1] += elapsed
+    timing[2] += iterations
+
+
+def _initial_basis(costs, supply, demand, priority):
+    """Return an initial basic feasible solution.
+
+    Cells are allocated greedily in order of increasing cost, except that cells
+    in ``priority`` are allocated first. Each allocation exhausts exactly one
+    row or column, so the result has ``m + n - 1`` basic cells, which form a
+    spanning tree of the rows and columns.
+    """
+    m, n = costs.shape
+    supply, demand = supply.copy(), demand.copy()
+    order = sorted(np.ndindex(m, n),
+                   key=lambda cell: (cell not in priority, costs[cell]))
+    flow = np.zeros([m, n])
+    basis = []
+    open_rows, open_columns = set(range(m)), set(range(n))
+    for i, j in order:
+        if i not in open_rows or j not in open_columns:
+            continue
+        amount = min(supply[i], demand[j])
+        flow[i, j] = amount
+        basis.append((i, j))
+        if len(basis) == m + n - 1:
+            break
+        # Never close the last open row or column while the other kind
+        # remains, which could happen through rounding errors.
+        close_row = supply[i] <= demand[j] or len(open_columns) == 1
+        if close_row and len(open_rows) > 1:
+            open_rows.remove(i)
+            demand[j] -= amount
+            supply[i] = 0
+        else:
+            open_columns.remove(j)
+            supply[i] -= amount
+            demand[j] = 0
+    return flow, basis
+
+
+def _tree_path(basis, m, start, end):
+    """Return the basic cells on the path between two nodes of the basis tree.
+
+    Rows are nodes ``0`` to ``m - 1`` and columns are nodes ``m`` onwards.
+    """
+    neighbours = defaultdict(list)
+    for i, j in basis:
+        neighbours[i].append((m + j, (i, j)))
+        neighbours[m + j].append((i, (i, j)))
+    previous = {start: None}
+    stack = [start]
+    while stack:
+        node = stack.pop()
+        if node == end:
+            break
+        for neighbour, cell in neighbours[node]:
+            if neighbour not in previous:
+                previous[neighbour] = (node, cell)
+                stack.append(neighbour)
+    path = []
+    node = end
+    while previous[node] is not None:
+        node, cell = previous[node]
+        path.append(cell)
+    return path[::-1]
+
+
+def _potentials(costs, basis, m, n):
+    """Return the dual variables ``u`` and ``v`` with ``u[i] + v[j] ==
+    costs[i, j]`` for every basic cell."""
+    u, v = np.full(m, np.nan), np.full(n, np.nan)
+    u[0] = 0
+    remaining = list(basis)
+    while remaining:
+        unresolved = []
+        for i, j in remaining:
+            if not np.isnan(u[i]):
+                v[j] = costs[i, j] - u[i]
+            elif not np.isnan(v[j]):
+                u[i] = costs[i, j] - v[j]
+            else:
+                unresolved.append((i, j))
+        remaining = unresolved
+    return u, v
+
+
+def solve(costs, supply, demand, priority=frozenset(), max_iterations=None):
+    """Solve a balanced transportation problem.
+
+    Args:
+        costs (np.ndarray): A matrix of the cost of moving a unit from each
+            source (row) to each sink (column).
+        supply (np.ndarray): The amount at each source.
+        demand (np.ndarray): The amount needed by each sink. The total demand
+            must equal the total supply.
+
+    Keyword Args:
+        priority (set[tuple[int]]): Cells to use first when building the
+            initial solution, *e.g.* the optimal basis of a similar problem.
+        max_iterations (int): The maximum number of simplex iterations.
+            Defaults to the number of cells of the problem.
+
+    Returns:
+        tuple[float, np.ndarray, list, int]: The minimal cost, the optimal
+        flow, the basic cells of the optimal solution, and the number of
+        simplex iterations taken.
+
+    Raises:
+        IterationLimit: If the optimal solution isn't found in
+            ``max_iterations`` iterations.
+    """
+    costs = np.asarray(costs, dtype=float)
+    m, n = costs.shape
+    flow, basis = _initial_basis(costs, np.asarray(supply, dtype=float),
+                                 np.asarray(demand, dtype=float), priority)
+    if max_iterations is None:
+        max_iterations = m * n
+    iterations = 0
+    # Whether to use Bland's rule, which is slower but can't cycle.
+    bland = False
+    while True:
+        u, v = _potentials(costs, basis, m, n)
+        reduced = costs - u[:, np.newaxis] - v[np.newaxis, :]
+        if bland:
+            # The first cell with a negative reduced cost.
+            candidates = np.flatnonzero(reduced < -_TOLERANCE)
+            if not candidates.size:
+                break
+            entering = np.unravel_index(candidates[0], reduced.shape)
+        else:
+            entering = np.unravel_index(np.argmin(reduced), reduced.shape)
+            if reduced[entering] >= -_TOLERANCE:
+                break
+        if iterations == max_iterations:
+            raise IterationLimit('No optimal solution after {} '
+                                 'iterations'.format(iterations))
+        iterations += 1
+        # The entering cell closes a cycle with the path from its column to
+        # its row in the basis tree. Flow alternately increases and
+        # decreases around the cycle.
+        cycle = [entering] + _tree_path(basis, m, m + entering[1], entering[0])
+        decreasing = cycle[1::2]
+        theta = min(flow[cell] for cell in decreasing)
+        if bland:
+            # The first of the cells whose flow drops to zero.
+            leaving = min(cell for cell in decreasing
+                          if flow[cell] <= theta + _TOLERANCE)
+        else:
+            leaving = min(decreasing, key=lambda cell: flow[cell])
+        # A pivot which doesn't move any flow can start a cycle.
+        bland = bland or theta <= _TOLERANCE
+        for cell in cycle[0::2]:
+            flow[cell] += theta
+        for cell in decreasing:
+            flow[cell] -= theta
+        flow[leaving] = 0
+        basis.remove(leaving)
+        basis.append(entering)
+    cost = float(np.sum(flow * costs))
+    return cost, flow, basis, iterations
+
+
+def constellation_emd(unique_C1, unique_C2, distances, distances_to_null,
+                      warm_start=None):
+    """Return the generalized EMD between two constellations.
+
+    Args:
+        unique_C1 (tuple[|Concept|]): The concepts only in the first
+            constellation.
+        unique_C2 (tuple[|Concept|]): The concepts only in the second
+            constellation.
+        distances (np.ndarray): The distances between each concept of
+            ``unique_C1`` and each concept of ``unique_C2``.
+        distances_to_null (np.ndarray): The distances from each concept of
+            ``unique_C1``, then each concept of ``unique_C2``, to the null
+            concept.
+
+    Keyword Args:
+        warm_start (WarmStart): The optimal basis of a similar problem, which
+            is replaced by the optimal basis of this one.
+
+    Returns:
+        float: The EMD between the constellations.
+
+    Raises:
+        IterationLimit: If the simplex method takes too many iterations.
+    """
+    start = time()
+    N = len(unique_C1)
+    supply = [c.phi for c in unique_C1]
+    demand = [c.phi for c in unique_C2]
+    # The null concept takes up whatever phi disappeared, or provides
+    # whatever phi appeared.
+    difference = sum(supply) - sum(demand)
+    rows = [('C1', c.mechanism) for c in unique_C1]
+    columns = [('C2', c.mechanism) for c in unique_C2]
+    if difference >= 0:
+        costs = np.hstack([distances, distances_to_null[:N, np.newaxis]])
+        demand.append(difference)
+        columns.append(NULL)
+    else:
+        costs = np.vstack([distances, distances_to_null[np.newaxis, N:]])
+        supply.append(-difference)
+        rows.append(NULL)
+    # Make the totals exactly equal, despite rounding.
+    demand[-1] += sum(supply) - sum(demand)
+
+    row_index = {label: i for i, label in enumerate(rows)}
+    column_index = {label: j for j, label in enumerate(columns)}
+    priority = set()
+    if warm_start is not None:
+        priority = {(row_index[r], column_index[c])
+                    for r, c in warm_start.basis
+                    if r in row_index and c in column_index}
+
+    cost, flow, basis, iterations = solve(costs, np.array(supply),
+                                          np.array(demand), priority)
+    if warm_start is not None:
+        warm_start.basis = {(rows[i], columns[j]) for i, j in basis}
+    record_timing('transport', time() - start, iterations)
+    return cost
+
+
+def pyemd_constellation_emd(d1, d2, distance_matrix):
+    """Return the generalized EMD between two constellations using pyemd,
+    recording the time taken."""
+    start = time()
+    result = utils.emd(d1, d2, distance_matrix)
+    record_timing('pyemd', time() - start)
+    return result
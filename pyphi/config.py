@@ -56,6 +56,32 @@ theoretical accuracy.
     >>> defaults['L1_DISTANCE_APPROXIMATION']
     False
 
+- ``pyphi.config.CONSTELLATION_EMD_SOLVER``: Control how the EMD between two
+  constellations is computed when concepts have moved (rather than only
+  disappeared). ``'pyemd'`` uses the external pyemd library;
+  ``'transport'`` uses the transportation simplex in
+  :mod:`~pyphi.compute.transport`, which exploits the structure of the
+  problem and is warm-started from the solution for the previous cut.
+
+    >>> defaults['CONSTELLATION_EMD_SOLVER']
+    'pyemd'
+
+- ``pyphi.config.MEASURE``: The measure of the distance between repertoires
+  used to compute |small_phi| (see :mod:`pyphi.measures`). ``'EMD'`` is the
+  exact Earth Mover's Distance. ``'L1'``, ``'SLICED_EMD'``, and
+  ``'ENTROPIC_EMD'`` are faster approximations, useful for screening many
+  systems.
+
+    >>> defaults['MEASURE']
+    'EMD'
+
+- ``pyphi.config.ENTROPIC_EMD_REGULARIZATION``: The strength of the entropic
+  regularization of the ``'ENTROPIC_EMD'`` measure. Smaller values are closer
+  to the exact EMD but take more iterations to compute.
+
+    >>> defaults['ENTROPIC_EMD_REGULARIZATION']
+    0.05
+
 System resources
 ~~~~~~~~~~~~~~~~
 
@@ -86,6 +112,39 @@ long time!), resulting in data loss.
     ``main_complex``, etc.) ``PARALLEL_CUT_EVALUATION`` will be fastest. Use
     ``PARALLEL_CONCEPT_EVALUATION`` if you are only computing constellations.
 
+- ``pyphi.config.PARALLEL_MACRO_EVALUATION``: Control whether the candidate
+  macro-systems in :func:`~pyphi.macro.emergence` are evaluated in parallel.
+  Each candidate is then evaluated with parallel cut and concept evaluation
+  disabled.
+
+    >>> defaults['PARALLEL_MACRO_EVALUATION']
+    False
+
+- ``pyphi.config.SUMMARIZE_CUT_EVALUATION``: If cuts are evaluated in
+  parallel, control whether each worker sends back only the |big_phi| value of
+  the cuts it evaluates, rather than their full |BigMip|. The |BigMip| of the
+  minimal cut is then recomputed once. This reduces memory use and the
+  overhead of communicating between processes, at the cost of evaluating one
+  cut twice.
+
+    >>> defaults['SUMMARIZE_CUT_EVALUATION']
+    False
+
+- ``pyphi.config.PARALLEL_CHUNK_SIZE``: In parallel evaluation, mechanisms
+  and cuts are sent to the worker processes in chunks, and the results come
+  back in batches, which reduces the overhead of communicating between
+  processes. If this is set, every chunk has this many items. If it is
+  ``None``, the chunk size is adapted to the measured cost of each item.
+
+    >>> defaults['PARALLEL_CHUNK_SIZE'] is None
+    True
+
+- ``pyphi.config.PARALLEL_CHUNK_TARGET_TIME``: When chunk sizes are adapted,
+  each chunk is sized to take about this many seconds to evaluate.
+
+    >>> defaults['PARALLEL_CHUNK_TARGET_TIME']
+    0.1
+
 - ``pyphi.config.NUMBER_OF_CORES``: Control the number of CPU cores used to
   evaluate unidirectional cuts. Negative numbers count backwards from the total
   number of available cores, with ``-1`` meaning "use all available cores."
@@ -113,7 +172,8 @@ however, it is recommended that you manage the results explicitly, rather than
 relying on the cache. For this reason it is disabled by default.
 
 - ``pyphi.config.CACHE_BIGMIPS``: Control whether |BigMip| objects are cached
-  and automatically retreived.
+  and automatically retreived. With the filesystem backend, they are kept in
+  the on-disk store in the :mod:`~pyphi.store` module.
 
     >>> defaults['CACHE_BIGMIPS']
     False
@@ -164,6 +224,28 @@ relying on the cache. For this reason it is disabled by default.
     >>> defaults['MONGODB_CONFIG']['collection_name']
     'cache'
 
+- ``pyphi.config.CHECKPOINT_RESULTS``: Control whether the progress of
+  |big_phi| computations is checkpointed, so that a computation which is
+  interrupted can be resumed without redoing finished cuts and subsystems. See
+  the :mod:`~pyphi.checkpoint` module.
+
+    >>> defaults['CHECKPOINT_RESULTS']
+    False
+
+- ``pyphi.config.CHECKPOINT_DIRECTORY``: If checkpointing is enabled,
+  checkpoints are stored in this directory.
+
+    >>> defaults['CHECKPOINT_DIRECTORY']
+    '__pyphi_checkpoints__'
+
+- ``pyphi.config.CHECKPOINT_INTERVAL``: If checkpointing is enabled, finished
+  cuts are written to disk in batches, at most every this many seconds, and
+  when the search for a MIP stops. This bounds both the number of writes and
+  the work lost if the computation is killed.
+
+    >>> defaults['CHECKPOINT_INTERVAL']
+    60
+
 - ``pyphi.config.REDIS_CACHE``: Specifies whether to use Redis to cache Mice.
 
     >>> defaults['REDIS_CACHE']
@@ -273,6 +355,24 @@ Miscellaneous
     >>> defaults['READABLE_REPRS']
     True
 
+
+- ``pyphi.config.EXPLOIT_SYMMETRY``: If set to ``True``, the automorphisms of
+  the network (permutations of its nodes which leave its TPM, connectivity
+  matrix and state unchanged) are used to compute the |big_phi| of only one
+  candidate subsystem per orbit when finding complexes; the |BigMip| of each of
+  the others is obtained by permuting the nodes of the computed one (see
+  :mod:`pyphi.symmetry`). Likewise, the MIP of a subsystem is found by
+  evaluating only one cut per orbit under the automorphisms of the subsystem.
+  Results are only reused in this way when no constellation involved has a
+  mechanism which is maximally irreducible over several purviews, since the
+  choice among tied purviews is not preserved by permuting the nodes;
+  otherwise the rest of the orbit is computed too, so |big_phi| values are
+  unchanged. When several cuts are minimal, though, the cut of a permuted
+  |BigMip| may differ from the one which would have been computed directly.
+
+    >>> defaults['EXPLOIT_SYMMETRY']
+    False
+
 -------------------------------------------------------------------------------
 """
 
@@ -294,6 +394,13 @@ DEFAULTS = {
     'CUT_ONE_APPROXIMATION': False,
     # Use L1 distance to approximate the EMD when computing MIPs.
     'L1_DISTANCE_APPROXIMATION': False,
+    # The solver for the EMD between constellations: "pyemd" or "transport".
+    'CONSTELLATION_EMD_SOLVER': 'pyemd',
+    # The measure of distance between repertoires: "EMD", "L1", "SLICED_EMD",
+    # or "ENTROPIC_EMD".
+    'MEASURE': 'EMD',
+    # The strength of the regularization of the "ENTROPIC_EMD" measure.
+    'ENTROPIC_EMD_REGULARIZATION': 0.05,
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
     # Controls whether concepts are evaluated in parallel.
     'PARALLEL_CONCEPT_EVALUATION': False,
@@ -301,6 +408,17 @@ DEFAULTS = {
     # memory. If cuts are evaluated sequentially, only two BigMips need to be
     # in memory at a time.
     'PARALLEL_CUT_EVALUATION': True,
+    # Controls whether candidate macro-systems are evaluated in parallel.
+    'PARALLEL_MACRO_EVALUATION': False,
+    # Controls whether parallel cut evaluation sends back only the phi value of
+    # each cut, recomputing the BigMip of the minimal cut at the end.
+    'SUMMARIZE_CUT_EVALUATION': False,
+    # The number of items sent to a worker process at once in parallel
+    # evaluation. None means the size is adapted to the cost of each item.
+    'PARALLEL_CHUNK_SIZE': None,
+    # The number of seconds each chunk should take when chunk sizes are
+    # adapted.
+    'PARALLEL_CHUNK_TARGET_TIME': 0.1,
     # The number of CPU cores to use in parallel cut evaluation. -1 means all
     # available cores, -2 means all but one available cores, etc.
     'NUMBER_OF_CORES': -1,
@@ -326,6 +444,13 @@ DEFAULTS = {
         'database_name': 'pyphi',
         'collection_name': 'cache'
     },
+    # Controls whether finished cuts and subsystems are checkpointed so that
+    # interrupted computations can be resumed.
+    'CHECKPOINT_RESULTS': False,
+    # Directory for checkpoints of interrupted computations.
+    'CHECKPOINT_DIRECTORY': '__pyphi_checkpoints__',
+    # Seconds between writes of batches of finished cuts to checkpoints.
+    'CHECKPOINT_INTERVAL': 60,
     # Use Redis to cache Mice
     'REDIS_CACHE': False,
     # Redis configuration
@@ -359,6 +484,10 @@ DEFAULTS = {
     'SINGLE_NODES_WITH_SELFLOOPS_HAVE_PHI': False,
     # Use prettier __str__-like formatting in `repr` calls.
     'READABLE_REPRS': True,
+    # Compute only one subsystem per orbit under the symmetries of the network
+    # when finding complexes, and only one cut per orbit under the symmetries
+    # of a subsystem when finding its MIP.
+    'EXPLOIT_SYMMETRY': False,
 }
 
 # Get a reference to this module's dictionary so we can set the configuration
@@ -136,7 +136,7 @@ def to_n_dimensional(tpm):
     return tpm.reshape([2] * N + [N], order="F").astype(float)
 
 
-def state_by_state2state_by_node(tpm):
+def state_by_state2state_by_node(tpm, chunk_size=None):
     """Convert a state-by-state TPM to a state-by-node TPM.
 
     .. note::
@@ -150,6 +150,10 @@ def state_by_state2state_by_node(tpm):
         tpm (list[list] or np.ndarray): A square state-by-state TPM with row
             and column indices following the **LOLI** convention.
 
+    Keyword Args:
+        chunk_size (int): If given, the rows are converted this many at a
+            time, which bounds the memory used by temporary arrays.
+
     Returns:
         np.ndarray: A state-by-node TPM, with row indices following the
         **LOLI** convention.
@@ -168,29 +172,25 @@ def state_by_state2state_by_node(tpm):
                 [ 0.3,  0.7]]])
     """
     # Cast to np.array.
-    tpm = np.array(tpm)
+    tpm = np.asarray(tpm)
     # Get the number of states from the length of one side of the TPM.
     S = tpm.shape[-1]
     # Get the number of nodes from the number of states.
     N = int(math.log(S, 2))
-    # Initialize the new state-by node TPM.
-    sbn_tpm = np.zeros(([2] * N + [N]))
-    # Map indices to state-tuples with the LOLI convention.
-    states = {i: loli_index2state(i, N) for i in range(S)}
-    # Get an array for each node with 1 in positions that correspond to that
-    # node being on in the next state, and a 0 otherwise.
-    node_on = np.array([[states[i][n] for i in range(S)] for n in range(N)])
-    on_probabilities = [tpm * node_on[n] for n in range(N)]
-    for i, state in states.items():
-        # Get the probability of each node being on given the past state i,
-        # i.e., a row of the state-by-node TPM.
-        # Assign that row to the ith state in the state-by-node TPM.
-        sbn_tpm[state] = [np.sum(on_probabilities[n][i]) for n in range(N)]
-    return sbn_tpm
-
-
-# TODO support nondeterministic TPMs
-def state_by_node2state_by_state(tpm):
+    # The probability that a node is on is the sum of the probabilities of
+    # the next states in which it is on, so multiply by the matrix of the
+    # states of each node in each state.
+    states = _loli_states(N)
+    if chunk_size is None:
+        sbn_tpm = tpm.dot(states)
+    else:
+        sbn_tpm = np.empty([S, N])
+        for i in range(0, S, chunk_size):
+            sbn_tpm[i:i + chunk_size] = tpm[i:i + chunk_size].dot(states)
+    return to_n_dimensional(sbn_tpm)
+
+
+def state_by_node2state_by_state(tpm, chunk_size=None, out=None):
     """Convert a state-by-node TPM to a state-by-state TPM.
 
     .. note::
@@ -212,6 +212,13 @@ def state_by_node2state_by_state(tpm):
             following the **LOLI** convention and column indices following the
             **HOLI** convention.
 
+    Keyword Args:
+        chunk_size (int): If given, the rows are converted this many at a
+            time, which bounds the memory used by temporary arrays.
+        out (np.ndarray): An array of shape ``(2**N, 2**N)`` in which to put
+            the result, *e.g.* a memory-mapped array for TPMs too large to
+            hold in memory.
+
     Returns:
         np.ndarray: A state-by-state TPM, with both row and column indices
         following the **HOLI** convention.
@@ -235,33 +242,37 @@ def state_by_node2state_by_state(tpm):
            [ 0.,  0.,  0.,  0.,  0.,  0.,  0.,  1.],
            [ 0.,  0.,  0.,  0.,  0.,  1.,  0.,  0.]])
     """
-    # Cast to np.array.
-    tpm = np.array(tpm)
-    # Convert to N-D form.
+    # Convert to N-D form, then flatten so the rows follow the LOLI
+    # convention.
     tpm = to_n_dimensional(tpm)
-    # Get the number of nodes from the last dimension of the TPM.
     N = tpm.shape[-1]
-    # Get the number of states.
     S = 2**N
-    # Initialize the state-by-state TPM.
-    sbs_tpm = np.zeros((S, S))
-    if not np.any(np.logical_and(tpm < 1, tpm > 0)):
-        # TPM is deterministic.
-        for past_state_index in range(S):
-            # Use the LOLI convention to get the row and column indices.
-            past_state = loli_index2state(past_state_index, N)
-            current_state_index = state2loli_index(tpm[past_state])
-            sbs_tpm[past_state_index, current_state_index] = 1
-    else:
-        # TPM is nondeterministic.
-        for past_state_index in range(S):
-            # Use the LOLI convention to get the row and column indices.
-            past_state = loli_index2state(past_state_index, N)
-            marginal_tpm = tpm[past_state]
-            for current_state_index in range(S):
-                current_state = np.array(
-                    [i for i in loli_index2state(current_state_index, N)])
-                sbs_tpm[past_state_index, current_state_index] = (
-                    np.prod(marginal_tpm[current_state == 1]) *
-                    np.prod(1 - marginal_tpm[current_state == 0]))
-    return sbs_tpm
+    tpm = tpm.reshape([S, N], order='F')
+    if out is None:
+        out = np.empty((S, S))
+    if chunk_size is None:
+        chunk_size = S
+    for i in range(0, S, chunk_size):
+        out[i:i + chunk_size] = _joint_probabilities(tpm[i:i + chunk_size])
+    return out
+
+
+def _loli_states(number_of_nodes):
+    """Return an array of all states of the nodes, one per row, in **LOLI**
+    order."""
+    indices = np.arange(2**number_of_nodes)[:, np.newaxis]
+    return (indices >> np.arange(number_of_nodes)) & 1
+
+
+def _joint_probabilities(tpm):
+    """Return the probability of each next state, in **LOLI** order, given the
+    probability that each node is on in each row of a 2-D state-by-node TPM,
+    assuming the nodes are conditionally independent."""
+    # The next state of node `n` is bit `n` of the index of the next state, so
+    # the joint distribution is built up by taking the outer product with the
+    # distribution of each node in turn.
+    joint = np.ones([len(tpm), 1])
+    for n in range(tpm.shape[-1]):
+        on = tpm[:, n, np.newaxis]
+        joint = np.concatenate([joint * (1 - on), joint * on], axis=1)
+    return joint
@@ -9,11 +9,16 @@ Methods for coarse-graining systems to different levels of spatial analysis.
 from collections import namedtuple
 import itertools
 import logging
+import math
 
 import numpy as np
 from scipy.stats import entropy
 
 from . import compute, config, constants, convert, utils, validate
+from .compute import parallel
+from .compute.big_phi import big_mip_bipartitions
+from .compute.progress import ProgressTracker
+from .constants import DIRECTIONS, PAST
 from .exceptions import ConditionallyDependentError, StateUnreachableError
 from .network import irreducible_purviews
 from .node import expand_node_tpm, generate_nodes
@@ -22,10 +27,6 @@ from .subsystem import Subsystem
 # Create a logger for this module.
 log = logging.getLogger(__name__)
 
-# Load precomputed partition lists.
-_NUM_PRECOMPUTED_PARTITION_LISTS = 10
-_partition_lists = utils.load_data('partition_lists',
-                                   _NUM_PRECOMPUTED_PARTITION_LISTS)
 
 def reindex(indices):
     """Generate a new set of node indices, the size of indices."""
@@ -71,13 +72,23 @@ class MacroSubsystem(Subsystem):
         self._time_scale = time_scale
         self._blackbox = blackbox
         self._coarse_grain = coarse_grain
+        # The macro elements affected by the cut; computed when needed
+        self._damaged_elements = None
 
         super().__init__(network, state, node_indices, cut, mice_cache)
 
+        # The TPM is transformed below, so the nodes generated from it can't be
+        # shared with other subsystems.
+        self._node_tpm_key = None
+
+        # Each stage of the pipeline is memoized in the network by the inputs
+        # it depends on, so that systems which only differ in later stages
+        # (e.g. the coarse-grains of one blackboxing) share the work.
+        key = (state, node_indices, cut)
+
         # Shrink TPM to size of internal indices
         # ======================================
-        self.tpm, self.cm, self.node_indices, self.state = (
-            self._squeeze(node_indices))
+        self._run_stage(('squeeze',) + key, self._squeeze, node_indices)
 
         validate.blackbox_and_coarse_grain(blackbox, coarse_grain)
 
@@ -88,19 +99,27 @@ class MacroSubsystem(Subsystem):
         if blackbox is not None:
             validate.blackbox(blackbox)
             blackbox = blackbox.reindex()
-            self.tpm = self._blackbox_partial_freeze(blackbox)
+            key += (blackbox,)
+            self._run_stage(('freeze',) + key, self._blackbox_partial_freeze,
+                            blackbox)
 
         # Blackbox over time
         # ==================
         if time_scale != 1:
             validate.time_scale(time_scale)
-            self.tpm, self.cm = self._blackbox_time(time_scale)
+            # The powers of the TPM are shared by all time scales.
+            powers = network.macro_pipeline_cache.get(('powers',) + key)
+            if powers is None:
+                powers = {}
+                network.macro_pipeline_cache.set(('powers',) + key, powers)
+            key += (time_scale,)
+            self._run_stage(('time',) + key, self._blackbox_time, time_scale,
+                            powers)
 
         # Blackbox in space
         # =================
         if blackbox is not None:
-            self.tpm, self.cm, self.node_indices, self.state = (
-                self._blackbox_space(blackbox))
+            self._run_stage(('space',) + key, self._blackbox_space, blackbox)
 
         # Coarse-grain in space
         # =====================
@@ -125,6 +144,23 @@ class MacroSubsystem(Subsystem):
 
         validate.subsystem(self)
 
+    def _run_stage(self, key, stage, *args):
+        """Update the TPM, CM, node indices, and state of the system with the
+        output of a stage of the macro pipeline.
+
+        The output is looked up in the pipeline cache of the network by
+        ``key``, and is only computed, by calling ``stage(*args)``, if it is
+        not there.
+        """
+        output = self.network.macro_pipeline_cache.get(key)
+        if output is None:
+            output = stage(*args)
+            # The output is shared by every system with the same key.
+            output[0].flags.writeable = False
+            output[1].flags.writeable = False
+            self.network.macro_pipeline_cache.set(key, output)
+        self.tpm, self.cm, self.node_indices, self.state = output
+
     def _squeeze(self, internal_indices):
         """Squeeze out all singleton dimensions in the Subsystem.
 
@@ -177,18 +213,23 @@ class MacroSubsystem(Subsystem):
                                                  hidden_inputs,
                                                  self.state))
 
-        return rebuild_system_tpm(node_tpms)
+        tpm = rebuild_system_tpm(node_tpms)
 
-    def _blackbox_time(self, time_scale):
+        return (tpm, self.cm, self.node_indices, self.state)
+
+    def _blackbox_time(self, time_scale, powers=None):
         """Black box the CM and TPM over the given time_scale.
 
+        ``powers`` holds the powers of the TPM computed for other time scales
+        (see :func:`~pyphi.utils.run_tpm`).
+
         TODO(billy): This is a blackboxed time. Coarse grain time is not yet
         implemented.
         """
-        tpm = utils.run_tpm(self.tpm, time_scale)
+        tpm = utils.run_tpm(self.tpm, time_scale, powers)
         cm = utils.run_cm(self.cm, time_scale)
 
-        return (tpm, cm)
+        return (tpm, cm, self.node_indices, self.state)
 
     def _blackbox_space(self, blackbox):
         """Blackbox the TPM and CM in space.
@@ -254,9 +295,78 @@ class MacroSubsystem(Subsystem):
                               self._node_indices, cut=cut,
                               time_scale=self._time_scale,
                               blackbox=self._blackbox,
-                              coarse_grain=self._coarse_grain)
-                              # TODO: is the MICE cache reusable?
-                              # mice_cache=self._mice_cache)
+                              coarse_grain=self._coarse_grain,
+                              mice_cache=self._mice_cache)
+
+    def _elements_damaged_by_cut(self):
+        """Return the macro elements whose TPM may be changed by the cut.
+
+        The cut is applied to the micro-system, where it changes the TPM of
+        every micro element with a severed input. Blackboxing and running the
+        TPM over time carry the change downstream, so in that case every micro
+        element reachable from a severed connection is affected. A macro
+        element is affected if the micro elements it is made of are.
+        """
+        if not self.is_cut:
+            return frozenset()
+
+        micro_indices = self._node_indices
+        cm = self.network.cm[np.ix_(micro_indices, micro_indices)]
+        damaged = np.any(self.cut_matrix * cm, axis=0)
+
+        if self._blackbox is not None or self._time_scale != 1:
+            while True:
+                reached = damaged | np.any(cm[damaged], axis=0)
+                if np.array_equal(reached, damaged):
+                    break
+                damaged = reached
+
+        damaged = {micro_indices[i] for i in np.flatnonzero(damaged)}
+
+        if self._coarse_grain is not None:
+            elements = self._coarse_grain.partition
+        elif self._blackbox is not None:
+            elements = [(i,) for i in self._blackbox.output_indices]
+        else:
+            elements = [(i,) for i in micro_indices]
+
+        return frozenset(i for i, element in enumerate(elements)
+                         if damaged.intersection(element))
+
+    def state_reachable(self):
+        """Return whether the state of the system can be reached according to
+        its TPM."""
+        # If there is a row `r` in the TPM such that all entries of `r - state`
+        # are between -1 and 1, then the given state has a nonzero probability
+        # of being reached from some state.
+        tpm = self.tpm[..., self.node_indices]
+        test = tpm - np.array(self.proper_state)
+        return np.any(np.logical_and(-1 < test, test < 1).all(-1))
+
+    def strongly_connected(self):
+        """Return whether the system is strongly connected."""
+        return utils.strongly_connected(self.cm, self.node_indices)
+
+    def automorphisms(self):
+        """Macro systems are cut at the micro level, so their automorphisms
+        are not used to skip symmetric cuts."""
+        return []
+
+    def mice_damaged_by_cut(self, mice):
+        """Return True if the cut affects a |Mice| of the uncut system.
+
+        A cause repertoire only depends on the TPMs of the mechanism elements
+        and an effect repertoire only on those of the purview elements, so the
+        |Mice| can be reused unless the cut changes one of them.
+        """
+        if self._damaged_elements is None:
+            self._damaged_elements = self._elements_damaged_by_cut()
+
+        if mice.direction == DIRECTIONS[PAST]:
+            elements = mice.mechanism
+        else:
+            elements = mice.purview
+        return not self._damaged_elements.isdisjoint(elements)
 
     def _potential_purviews(self, direction, mechanism, purviews=False):
         """Override Subsystem implementation using Network-level indices."""
@@ -377,9 +487,6 @@ class CoarseGrain(namedtuple('CoarseGrain', ['partition', 'grouping'])):
         """
         assert len(micro_state) == len(self.micro_indices)
 
-        # TODO: only reindex if this coarse grain is not already from 0..n?
-        # make_mapping calls this in a tight loop so it might be more efficient
-        # to reindex conditionally.
         reindexed = self.reindex()
 
         micro_state = np.array(micro_state)
@@ -396,14 +503,20 @@ class CoarseGrain(namedtuple('CoarseGrain', ['partition', 'grouping'])):
             |ith| entry in the mapping is the macro-state corresponding to the
             |ith| micro-state.
         """
-        micro_states = utils.all_states(len(self.micro_indices))
+        micro_states = convert._loli_states(len(self.micro_indices))
+        reindexed = self.reindex()
 
-        # Find the corresponding macro-state for each micro-state.
+        # Find the corresponding macro-state for each micro-state, as a LOLI
+        # index: bit `i` is set if macro element `i` is on, i.e. if the number
+        # of its micro elements which are on is not in its "off" grouping.
         # The i-th entry in the mapping is the macro-state corresponding to the
         # i-th micro-state.
-        mapping = [convert.state2loli_index(self.macro_state(micro_state))
-                   for micro_state in micro_states]
-        return np.array(mapping)
+        mapping = np.zeros(len(micro_states), dtype=int)
+        for i in self.macro_indices:
+            on_count = micro_states[:, list(reindexed.partition[i])].sum(1)
+            macro_on = ~np.in1d(on_count, self.grouping[i][0])
+            mapping |= macro_on.astype(int) << i
+        return mapping
 
     def macro_tpm(self, micro_tpm, check_independence=True):
         """Create a coarse-grained macro TPM.
@@ -425,20 +538,18 @@ class CoarseGrain(namedtuple('CoarseGrain', ['partition', 'grouping'])):
         mapping = self.make_mapping()
 
         num_macro_states = 2 ** len(self.macro_indices)
-        macro_tpm = np.zeros((num_macro_states, num_macro_states))
-
-        micro_states = range(2 ** len(self.micro_indices))
-        micro_state_transitions = itertools.product(micro_states, micro_states)
 
-        # For every possible micro-state transition, get the corresponding past
-        # and current macro-state using the mapping and add that probability to
-        # the state-by-state macro TPM.
-        for past_state, current_state in micro_state_transitions:
-            macro_tpm[mapping[past_state], mapping[current_state]] += (
-                micro_tpm[past_state, current_state])
+        # Sum the probabilities of all micro-state transitions which map to
+        # the same macro-state transition: a matrix with a 1 for each
+        # micro-state in the column of its macro-state groups the columns,
+        # and its transpose groups the rows.
+        grouping = np.zeros((len(mapping), num_macro_states))
+        grouping[np.arange(len(mapping)), mapping] = 1
+        macro_tpm = grouping.T.dot(micro_tpm).dot(grouping)
 
         # Re-normalize each row because we're going from larger to smaller TPM
-        macro_tpm = np.array([utils.normalize(row) for row in macro_tpm])
+        row_sums = macro_tpm.sum(1, keepdims=True)
+        macro_tpm = macro_tpm / np.where(row_sums == 0, 1, row_sums)
 
         if check_independence:
             validate.conditionally_independent(macro_tpm)
@@ -523,9 +634,64 @@ class Blackbox(namedtuple('Blackbox', ['partition', 'output_indices'])):
         return False
 
 
+def _restricted_growth_strings(N):
+    """Generate the restricted growth strings of length |N|, in lexicographic
+    order.
+
+    A restricted growth string ``a`` labels each of |N| elements with the
+    part of a set partition it belongs to, with parts numbered in order of
+    their first element: ``a[0] == 0`` and ``a[i] <= max(a[:i]) + 1``.
+
+    Example:
+        >>> list(_restricted_growth_strings(3))
+        [(0, 0, 0), (0, 0, 1), (0, 1, 0), (0, 1, 1), (0, 1, 2)]
+    """
+    if N == 0:
+        yield ()
+        return
+
+    string = [0] * N
+    # The largest label each element can take, given the labels before it.
+    limits = [0] + [1] * (N - 1)
+    while True:
+        yield tuple(string)
+        # Increment the rightmost label that can be incremented, and reset
+        # the labels after it.
+        i = N - 1
+        while i > 0 and string[i] == limits[i]:
+            i -= 1
+        if i == 0:
+            return
+        string[i] += 1
+        limit = max(limits[i], string[i] + 1)
+        for j in range(i + 1, N):
+            string[j] = 0
+            limits[j] = limit
+
+
+def _partitions(N):
+    """Generate all partitions of the |N| binary nodes.
+
+    The partitions are generated in the lexicographic order of their
+    restricted growth strings, starting with the partition into a single
+    part and ending with the partition into singletons.
+
+    Yields:
+        list[list]: A partition, as a list of the lists of micro-elements
+        corresponding to each macro-element.
+    """
+    for string in _restricted_growth_strings(N):
+        partition = [[] for i in range(max(string, default=-1) + 1)]
+        for element, part in enumerate(string):
+            partition[part].append(element)
+        yield partition
+
+
 def _partitions_list(N):
     """Return a list of partitions of the |N| binary nodes.
 
+    The partition into a single part is not included.
+
     Args:
         N (int): The number of nodes under consideration.
 
@@ -537,17 +703,15 @@ def _partitions_list(N):
         >>> _partitions_list(3)
         [[[0, 1], [2]], [[0, 2], [1]], [[0], [1, 2]], [[0], [1], [2]]]
     """
-    if N < (_NUM_PRECOMPUTED_PARTITION_LISTS):
-        return list(_partition_lists[N])
-    else:
-        raise ValueError(
-            'Partition lists not yet available for system with {} '
-            'nodes or more'.format(_NUM_PRECOMPUTED_PARTITION_LISTS))
+    return list(itertools.islice(_partitions(N), 1, None))
 
 
 def all_partitions(indices):
     """Return a list of all possible coarse grains of a network.
 
+    The partitions are generated lazily, so this can be used for any number of
+    nodes.
+
     Args:
         indices (tuple[int]): The micro indices to partition.
 
@@ -556,13 +720,18 @@ def all_partitions(indices):
         is a tuple of micro-elements which correspond to macro-elements.
     """
     n = len(indices)
-    partitions = _partitions_list(n)
-    if n > 0:
-        partitions[-1] = [list(range(n))]
+    if n == 0:
+        return
 
-    for partition in partitions:
-        yield tuple(tuple(indices[i] for i in part)
-                    for part in partition)
+    # Skip the partition into a single part, which is generated first, and
+    # the partition into singletons, which is the micro-system itself; the
+    # single part comes last instead.
+    for partition in itertools.islice(_partitions(n), 1, None):
+        if len(partition) < n:
+            yield tuple(tuple(indices[i] for i in part)
+                        for part in partition)
+
+    yield (tuple(indices),)
 
 
 def all_groupings(partition):
@@ -641,6 +810,134 @@ def all_blackboxes(indices):
             yield blackbox
 
 
+def _permute(tpm, cm, state, permutation):
+    """Reorder the nodes of a macro-system so that node ``i`` of the result is
+    node ``permutation[i]`` of the original."""
+    permutation = list(permutation)
+    tpm = tpm.transpose(permutation + [len(permutation)])[..., permutation]
+    cm = cm[np.ix_(permutation, permutation)]
+    state = tuple(state[i] for i in permutation)
+    return tpm, cm, state
+
+
+# The maximum number of orderings of nodes with identical signatures that
+# `canonical_form` compares.
+_MAX_ARRANGEMENTS = 5040
+
+
+def _form(tpm, cm, state):
+    """Return a hashable representation of a macro-system."""
+    tpm = np.round(tpm, config.PRECISION) + 0.0
+    return (tpm.tobytes(), cm.astype(int).tobytes(), state)
+
+
+def canonical_form(tpm, cm, state):
+    """Return a canonical form of a system, identical for all systems that are
+    the same up to a permutation of their nodes.
+
+    Nodes are sorted by a signature which does not depend on their order (the
+    node's state, the distribution of its TPM values, and its degrees),
+    refined by the signatures of the node's inputs and outputs. Only the
+    orderings of nodes with identical signatures are then compared, and the
+    lexicographically smallest is chosen.
+
+    If there are more than ``_MAX_ARRANGEMENTS`` such orderings, nodes with
+    identical signatures are left in their original order instead. The form
+    then still identifies the system exactly, but some permutations of the
+    system may have a different form.
+
+    Args:
+        tpm (np.ndarray): The |N-D| state-by-node TPM of the system.
+        cm (np.ndarray): The connectivity matrix of the system.
+        state (tuple[int]): The state of the system.
+
+    Returns:
+        tuple[tuple, list[tuple[int]]]: The canonical form, and every
+        permutation of the nodes which transforms the system into it.
+    """
+    tpm, cm = np.asarray(tpm), np.asarray(cm)
+    n = len(state)
+    if n == 0:
+        return _form(tpm, cm, state), [()]
+
+    def signature(i):
+        values = np.sort(np.round(tpm[..., i], config.PRECISION).ravel())
+        return (state[i], values.tobytes(), cm[i].sum(), cm[:, i].sum())
+
+    def ranks(values):
+        distinct = sorted(set(values))
+        return [distinct.index(value) for value in values]
+
+    signatures = ranks([signature(i) for i in range(n)])
+    # Refine the signatures by those of each node's inputs and outputs,
+    # until no more nodes are told apart.
+    while True:
+        refined = ranks([
+            (signatures[i],
+             tuple(sorted(signatures[j] for j in np.flatnonzero(cm[:, i]))),
+             tuple(sorted(signatures[j] for j in np.flatnonzero(cm[i]))))
+            for i in range(n)])
+        if len(set(refined)) == len(set(signatures)):
+            break
+        signatures = refined
+
+    order = sorted(range(n), key=lambda i: signatures[i])
+    ties = [list(group) for _, group in
+            itertools.groupby(order, key=lambda i: signatures[i])]
+    arrangements = 1
+    for group in ties:
+        arrangements *= math.factorial(len(group))
+    if arrangements > _MAX_ARRANGEMENTS:
+        permutation = tuple(order)
+        return _form(*_permute(tpm, cm, state, permutation)), [permutation]
+
+    best_form, best_permutations = None, []
+    for arrangement in itertools.product(
+            *(itertools.permutations(group) for group in ties)):
+        permutation = tuple(itertools.chain.from_iterable(arrangement))
+        form = _form(*_permute(tpm, cm, state, permutation))
+        if best_form is None or form < best_form:
+            best_form, best_permutations = form, [permutation]
+        elif form == best_form:
+            best_permutations.append(permutation)
+    return best_form, best_permutations
+
+
+def equivalence_key(subsystem):
+    """Return a key which is equal for macro-systems that have the same
+    |big_phi| because they are the same up to a permutation of their macro
+    elements.
+
+    Since cuts are applied to the micro-system, macro-systems with the same
+    TPM can still have different |big_phi|. So the key includes the macro
+    TPM of every cut of the subsystem as well, relabeled by a permutation
+    which brings the uncut system into its :func:`canonical_form`.
+
+    Args:
+        subsystem (MacroSubsystem): The macro-system.
+
+    Returns:
+        tuple: The key.
+    """
+    return _equivalence_key(subsystem, *canonical_form(
+        subsystem.tpm, subsystem.cm, subsystem.state))
+
+
+def _equivalence_key(subsystem, form, permutations):
+    """Return the :func:`equivalence_key` of a macro-system, given its
+    :func:`canonical_form`."""
+    # Cuts are not evaluated for systems with fewer than two elements.
+    if len(subsystem) < 2:
+        return (form, ())
+    cut_subsystems = [subsystem.apply_cut(cut) for cut in
+                      big_mip_bipartitions(subsystem.cut_indices)]
+    cut_forms = min(
+        tuple(sorted(_form(*_permute(s.tpm, s.cm, s.state, permutation))
+                     for s in cut_subsystems))
+        for permutation in permutations)
+    return (form, cut_forms)
+
+
 class MacroNetwork:
     """A coarse-grained network of nodes.
 
@@ -682,6 +979,27 @@ class MacroNetwork:
         return round(self.phi - self.micro_phi, config.PRECISION)
 
 
+def _unique_big_phi(big_mip):
+    """Return the |big_phi| of a |BigMip| and whether it is ``unique``."""
+    return big_mip.phi, getattr(big_mip, 'unique', False)
+
+
+def _equivalent_big_phi(subsystem, phis):
+    """Return the |big_phi| of a macro-system, looking it up in ``phis`` by
+    :func:`equivalence_key` and storing it there if it is not found.
+
+    A stored |big_phi| is only reused if it is ``unique`` (see |BigMip|);
+    otherwise tied purviews could make the |big_phi| of equivalent systems
+    differ, so it is computed directly.
+    """
+    key = equivalence_key(subsystem)
+    if key in phis and phis[key][1]:
+        return phis[key][0]
+    phi, unique = _unique_big_phi(compute.big_mip(subsystem))
+    phis.setdefault(key, (phi, unique))
+    return phi
+
+
 def coarse_grain(network, state, internal_indices):
     """Find the maximal coarse-graining of a micro-system.
 
@@ -695,6 +1013,7 @@ def coarse_grain(network, state, internal_indices):
     """
     max_phi = float('-inf')
     max_coarse_grain = CoarseGrain((), ())
+    phis = {}
 
     for coarse_grain in all_coarse_grains(internal_indices):
         try:
@@ -703,7 +1022,7 @@ def coarse_grain(network, state, internal_indices):
         except ConditionallyDependentError:
             continue
 
-        phi = compute.big_phi(subsystem)
+        phi = _equivalent_big_phi(subsystem, phis)
         if (phi - max_phi) > constants.EPSILON:
             max_phi = phi
             max_coarse_grain = coarse_grain
@@ -711,8 +1030,9 @@ def coarse_grain(network, state, internal_indices):
     return (max_phi, max_coarse_grain)
 
 
-def all_macro_systems(network, state, blackbox, coarse_grain, time_scales):
-    """Generator over all possible macro-systems for the network."""
+def _macro_system_parameters(network, blackbox, coarse_grain, time_scales):
+    """Generator over the parameters ``(system, time_scale, blackbox,
+    coarse_grain)`` of all possible macro-systems for the network."""
 
     if time_scales is None:
         time_scales = [1]
@@ -735,15 +1055,172 @@ def all_macro_systems(network, state, blackbox, coarse_grain, time_scales):
         for time_scale in time_scales:
             for blackbox in blackboxes(system):
                 for coarse_grain in coarse_grains(blackbox, system):
-                    try:
-                        yield MacroSubsystem(
-                            network, state, system,
-                            time_scale=time_scale,
-                            blackbox=blackbox,
-                            coarse_grain=coarse_grain)
-                    except (StateUnreachableError,
-                            ConditionallyDependentError):
-                        continue
+                    yield (system, time_scale, blackbox, coarse_grain)
+
+
+def all_macro_systems(network, state, blackbox, coarse_grain, time_scales):
+    """Generator over all possible macro-systems for the network."""
+    for system, time_scale, blackbox, coarse_grain in _macro_system_parameters(
+            network, blackbox, coarse_grain, time_scales):
+        try:
+            yield MacroSubsystem(network, state, system,
+                                 time_scale=time_scale,
+                                 blackbox=blackbox,
+                                 coarse_grain=coarse_grain)
+        except (StateUnreachableError, ConditionallyDependentError):
+            continue
+
+
+def _micro_reducible(network, system, blackbox, coarse_grain):
+    """Return whether a macro-system is known to have |big_phi| = 0 without
+    computing it.
+
+    Cuts of macro-systems are applied to the micro-system. If the micro-system
+    is not strongly connected, some cut severs no connections, so the cut
+    system is identical to the uncut one. This does not apply if only
+    single-node cuts are considered, or to systems with a single macro
+    element, which have a hard-coded |big_phi| value.
+    """
+    if coarse_grain is not None:
+        size = len(coarse_grain.partition)
+    elif blackbox is not None:
+        size = len(blackbox.output_indices)
+    else:
+        size = len(system)
+    return (size > 1 and not config.CUT_ONE_APPROXIMATION and
+            not network.strongly_connected(system))
+
+
+def _macro_system(candidate, network, state):
+    """Return the |MacroSubsystem| of a candidate."""
+    _, system, time_scale, blackbox, coarse_grain, _ = candidate
+    return MacroSubsystem(network, state, system, time_scale=time_scale,
+                          blackbox=blackbox, coarse_grain=coarse_grain)
+
+
+def _macro_big_phi(subsystem):
+    """Return the |big_phi| of a macro-system candidate and whether it is
+    ``unique``."""
+    # Candidates are already spread across processes.
+    with config.override(PARALLEL_CUT_EVALUATION=False,
+                         PARALLEL_CONCEPT_EVALUATION=False):
+        return _unique_big_phi(compute.big_mip(subsystem))
+
+
+class _MacroSystemPhis:
+    """Compute the |big_phi| of macro-system candidates one at a time,
+    computing it only once for each set of equivalent candidates.
+
+    The full :func:`equivalence_key` is only computed for candidates whose
+    canonical TPM is shared with an earlier candidate. A |big_phi| is only
+    reused if it is ``unique`` (see |BigMip|); otherwise the candidate is
+    computed directly. When candidates are evaluated in parallel, each worker
+    has its own copy of this object, so equivalent candidates are only
+    recognized within a worker.
+    """
+
+    def __init__(self):
+        # Canonical form -> the first candidate with that form (or ``None``
+        # once its equivalence key has been computed), its |big_phi|, and
+        # whether that is unique.
+        self.firsts = {}
+        # Equivalence key -> |big_phi| and whether it is unique, for
+        # candidates whose form is shared.
+        self.phis = {}
+
+    def __call__(self, candidate, network, state):
+        """Return the index of a candidate and its |big_phi|, or ``None`` if
+        the macro-system is not valid."""
+        index, reducible = candidate[0], candidate[-1]
+        try:
+            subsystem = _macro_system(candidate, network, state)
+        except (StateUnreachableError, ConditionallyDependentError):
+            return index, None
+        if reducible:
+            return index, 0.0
+
+        form, permutations = canonical_form(subsystem.tpm, subsystem.cm,
+                                            subsystem.state)
+        if form not in self.firsts:
+            phi, unique = _macro_big_phi(subsystem)
+            self.firsts[form] = (candidate, phi, unique)
+            return index, phi
+
+        first, first_phi, first_unique = self.firsts[form]
+        if first is not None:
+            first_key = equivalence_key(_macro_system(first, network, state))
+            self.phis[first_key] = (first_phi, first_unique)
+            self.firsts[form] = (None, first_phi, first_unique)
+        key = _equivalence_key(subsystem, form, permutations)
+        if key in self.phis and self.phis[key][1]:
+            return index, self.phis[key][0]
+        phi, unique = _macro_big_phi(subsystem)
+        self.phis.setdefault(key, (phi, unique))
+        return index, phi
+
+
+def stream_emergence(network, state, blackbox=False, coarse_grain=True,
+                     time_scales=None, micro_phi=None):
+    """Compute the |big_phi| of every macro-system of a network, yielding each
+    one as soon as it is finished.
+
+    Candidates are evaluated in parallel if
+    ``config.PARALLEL_MACRO_EVALUATION`` is enabled. Candidates whose
+    micro-system is not strongly connected are not computed, since their
+    |big_phi| is necessarily 0, and |big_phi| is computed only once for each
+    set of candidates with the same :func:`equivalence_key` (within each
+    worker, when evaluating in parallel). Each candidate is evaluated lazily,
+    as the generator is consumed. Invalid
+    candidates (which are not conditionally independent, or are in an
+    unreachable state) are skipped and counted as finished.
+
+    See :func:`emergence` for a description of the arguments.
+
+    Keyword Args:
+        micro_phi (float): The |big_phi| of the main complex of the
+            micro-system, if it is already known.
+
+    Yields:
+        tuple[int, MacroNetwork, |Progress|]: The position of the next
+        finished candidate among all the candidates, its macro-system, and
+        the progress of the computation so far. The ``best`` attribute of the
+        progress is the ``MacroNetwork`` with maximal |big_phi| found so far.
+    """
+    if micro_phi is None:
+        micro_phi = compute.main_complex(network, state).phi
+
+    parameters = list(_macro_system_parameters(network, blackbox,
+                                               coarse_grain, time_scales))
+    candidates = [(index, system, time_scale, blackbox, coarse_grain,
+                   _micro_reducible(network, system, blackbox, coarse_grain))
+                  for index, (system, time_scale, blackbox, coarse_grain)
+                  in enumerate(parameters)]
+    log.info('Evaluating {} macro-system candidates, {} of which are '
+             'reducible.'.format(len(candidates),
+                                 sum(c[-1] for c in candidates)))
+
+    phis = _MacroSystemPhis()
+    if config.PARALLEL_MACRO_EVALUATION:
+        results = parallel.imap_chunked(phis, candidates,
+                                        args=(network, state))
+    else:
+        results = (phis(candidate, network, state)
+                   for candidate in candidates)
+    tracker = ProgressTracker(len(candidates),
+                              key=lambda macro_network: macro_network.phi)
+    for index, phi in results:
+        if phi is None:
+            tracker.update()
+            continue
+        system, time_scale, blackbox, coarse_grain = parameters[index]
+        macro_network = MacroNetwork(network=network,
+                                     system=system,
+                                     macro_phi=phi,
+                                     micro_phi=micro_phi,
+                                     time_scale=time_scale,
+                                     blackbox=blackbox,
+                                     coarse_grain=coarse_grain)
+        yield index, macro_network, tracker.update(macro_network)
 
 
 def emergence(network, state, blackbox=False, coarse_grain=True,
@@ -770,32 +1247,27 @@ def emergence(network, state, blackbox=False, coarse_grain=True,
     Returns:
         MacroNetwork: The maximal macro-system generated from the micro-system.
     """
-    micro_phi = compute.main_complex(network, state).phi
+    results = stream_emergence(network, state, blackbox=blackbox,
+                               coarse_grain=coarse_grain,
+                               time_scales=time_scales)
+    # Candidates may finish in any order; choose the maximum in the order of
+    # `all_macro_systems` so that ties are broken consistently.
+    macro_networks = sorted(results, key=lambda result: result[0])
 
     max_phi = float('-inf')
     max_network = None
 
-    for subsystem in all_macro_systems(network, state, blackbox=blackbox,
-                                       coarse_grain=coarse_grain,
-                                       time_scales=time_scales):
-        phi = compute.big_phi(subsystem)
-
-        if (phi - max_phi) > constants.EPSILON:
-            max_phi = phi
-            max_network = MacroNetwork(
-                network=network,
-                macro_phi=phi,
-                micro_phi=micro_phi,
-                system=subsystem._node_indices,
-                time_scale=subsystem._time_scale,
-                blackbox=subsystem._blackbox,
-                coarse_grain=subsystem._coarse_grain)
+    for _, macro_network, _ in macro_networks:
+        if (macro_network.phi - max_phi) > constants.EPSILON:
+            max_phi = macro_network.phi
+            max_network = macro_network
 
     return max_network
 
 
 def phi_by_grain(network, state):
     list_of_phi = []
+    phis = {}
 
     systems = utils.powerset(network.node_indices)
     for system in systems:
@@ -810,7 +1282,7 @@ def phi_by_grain(network, state):
             except ConditionallyDependentError:
                 continue
 
-            phi = compute.big_phi(subsystem)
+            phi = _equivalent_big_phi(subsystem, phis)
             list_of_phi.append([len(subsystem), phi, system, coarse_grain])
     return list_of_phi
 
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# measures.py
+
+"""
+Measures of the distance between repertoires, used to compute |small_phi|.
+
+The measure is selected with ``config.MEASURE``. The available measures are:
+
+- ``'EMD'``: the exact Earth Mover's Distance, with the Hamming distance
+  between states as the ground distance. Effect repertoires are products of
+  independent distributions over each node, so for them the EMD is computed
+  analytically as the sum of the differences of the marginal distributions.
+- ``'L1'``: the L1 distance between the repertoires.
+- ``'SLICED_EMD'``: the sum of the EMDs between the marginal distributions of
+  each node. This is exact for effect repertoires and a lower bound of the EMD
+  for cause repertoires.
+- ``'ENTROPIC_EMD'``: the entropy-regularized EMD, computed with Sinkhorn
+  iterations, for cause repertoires, and the exact EMD for effect repertoires.
+  The amount of regularization is set by
+  ``config.ENTROPIC_EMD_REGULARIZATION``.
+
+The approximate measures are much faster than the exact EMD, which makes them
+useful for screening many systems before computing the exact values for the
+interesting ones (see :func:`~pyphi.compute.big_phi.screen_main_complexes`).
+
+Every measure has a function comparing two repertoires and a batch function
+comparing one repertoire to a stack of repertoires of the same shape, which
+the L1, sliced and entropic measures compute with vectorized array
+operations. |find_mip| uses the batch functions of the approximate measures
+to compare a repertoire with all its partitioned repertoires at once. New
+measures can be added with :func:`register`.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from . import config, utils
+from .constants import DIRECTIONS, PAST
+
+# The maximum number of Sinkhorn iterations for the entropic EMD.
+_SINKHORN_ITERATIONS = 1000
+# Sinkhorn iterations stop when the marginals are this close to the targets.
+_SINKHORN_TOLERANCE = 1e-9
+
+
+class Measure(namedtuple('Measure', ['distance', 'batch'])):
+    """A measure of the distance between repertoires.
+
+    Attributes:
+        distance (function): Called as ``distance(direction, d1, d2)``; returns
+            the distance between two repertoires.
+        batch (function): Called as ``batch(direction, d1, d2s)``, where
+            ``d2s`` is an array of repertoires stacked along the first axis;
+            returns an array of the distances from ``d1`` to each of them.
+    """
+
+    __slots__ = ()
+
+
+#: The registered :class:`Measure` objects, by name.
+registry = {}
+
+
+def register(name, distance, batch=None):
+    """Register a measure under a name which can be used in
+    ``config.MEASURE``.
+
+    Args:
+        name (str): The name of the measure.
+        distance (function): The function comparing two repertoires.
+
+    Keyword Args:
+        batch (function): The function comparing a repertoire to a stack of
+            repertoires. Defaults to calling ``distance`` on each of them.
+    """
+    if batch is None:
+        def batch(direction, d1, d2s):
+            return np.array([distance(direction, d1, d2) for d2 in d2s])
+    registry[name] = Measure(distance, batch)
+
+
+def get(name=None):
+    """Return a registered :class:`Measure`.
+
+    Keyword Args:
+        name (str): The name of the measure. Defaults to ``config.MEASURE``.
+
+    Raises:
+        ValueError: If there is no measure with that name.
+    """
+    name = name or config.MEASURE
+    try:
+        return registry[name]
+    except KeyError:
+        raise ValueError('Unknown MEASURE {!r}; must be one of {}.'.format(
+            name, sorted(registry)))
+
+
+def distance(direction, d1, d2):
+    """Return the distance between two repertoires, using the measure set by
+    ``config.MEASURE``."""
+    return get().distance(direction, d1, d2)
+
+
+def batch_distance(direction, d1, d2s):
+    """Return the distances between a repertoire and each of a stack of
+    repertoires, using the measure set by ``config.MEASURE``."""
+    return get().batch(direction, d1, np.asarray(d2s))
+
+
+# Marginals
+# =============================================================================
+
+def _marginals_zero(repertoires, ndim):
+    """Return the probability that each node is off, for each repertoire in a
+    stack of repertoires with ``ndim`` dimensions each."""
+    repertoires = np.asarray(repertoires)
+    offset = repertoires.ndim - ndim
+    return np.stack([
+        np.take(repertoires, 0, axis=offset + i).reshape(
+            repertoires.shape[:offset] + (-1,)).sum(-1)
+        for i in range(ndim)
+    ], axis=-1)
+
+
+def sliced_emd(direction, d1, d2):
+    """Return the sum of the EMDs between the marginal distributions of each
+    node.
+
+    The EMD between the marginal distributions of a node is the absolute
+    difference in the probabilities that the node is off.
+    """
+    return np.abs(_marginals_zero(d1, d1.ndim) -
+                  _marginals_zero(d2, d2.ndim)).sum()
+
+
+def sliced_emd_batch(direction, d1, d2s):
+    """Return the :func:`sliced_emd` from ``d1`` to each of ``d2s``."""
+    return np.abs(_marginals_zero(d2s, d1.ndim) -
+                  _marginals_zero(d1, d1.ndim)).sum(-1)
+
+
+# Exact EMD
+# =============================================================================
+
+def emd(direction, d1, d2):
+    """Return the exact EMD between two repertoires."""
+    if direction == DIRECTIONS[PAST]:
+        return utils.hamming_emd(d1, d2)
+    # Effect repertoires are products of independent distributions, so the
+    # EMD between them is the sum of the EMDs of the marginals.
+    return sliced_emd(direction, d1, d2)
+
+
+def emd_batch(direction, d1, d2s):
+    """Return the :func:`emd` from ``d1`` to each of ``d2s``.
+
+    Only the EMD between effect repertoires is vectorized; the EMD between
+    cause repertoires is solved with pyemd for each of them.
+    """
+    if direction == DIRECTIONS[PAST]:
+        return np.array([utils.hamming_emd(d1, d2) for d2 in d2s])
+    return sliced_emd_batch(direction, d1, d2s)
+
+
+# L1 distance
+# =============================================================================
+
+def l1(direction, d1, d2):
+    """Return the L1 distance between two repertoires."""
+    return utils.l1(d1, d2)
+
+
+def l1_batch(direction, d1, d2s):
+    """Return the :func:`l1` distance from ``d1`` to each of ``d2s``."""
+    return np.abs(d2s - d1).reshape(len(d2s), -1).sum(-1)
+
+
+# Entropic EMD
+# =============================================================================
+
+def _sinkhorn(a, b, cost):
+    """Return the transport cost of the entropy-regularized optimal transport
+    plans between ``a`` and each row of ``b``.
+
+    The Sinkhorn iterations for every row are run at once.
+    """
+    kernel = np.exp(-cost / config.ENTROPIC_EMD_REGULARIZATION)
+    u = np.ones_like(b)
+    v = np.ones_like(b)
+    for _ in range(_SINKHORN_ITERATIONS):
+        u = a / np.maximum(v.dot(kernel.T), np.finfo(float).tiny)
+        v = b / np.maximum(u.dot(kernel), np.finfo(float).tiny)
+        # The column marginals are exact after updating `v`; stop when the
+        # row marginals are too.
+        if np.abs(u * v.dot(kernel.T) - a).max() < _SINKHORN_TOLERANCE:
+            break
+    # The plan for each pair is diag(u) K diag(v).
+    return np.einsum('ki,ij,kj->k', u, kernel * cost, v)
+
+
+def entropic_emd_batch(direction, d1, d2s):
+    """Return the :func:`entropic_emd` from ``d1`` to each of ``d2s``."""
+    if direction != DIRECTIONS[PAST]:
+        return sliced_emd_batch(direction, d1, d2s)
+    d1 = d1.squeeze()
+    d2s = d2s.reshape((len(d2s),) + d1.shape)
+    cost = utils._hamming_matrix(d1.ndim)
+    return _sinkhorn(d1.ravel(), d2s.reshape(len(d2s), -1), cost)
+
+
+def entropic_emd(direction, d1, d2):
+    """Return the entropy-regularized EMD between two repertoires."""
+    return entropic_emd_batch(direction, d1, d2[np.newaxis])[0]
+
+
+register('EMD', emd, emd_batch)
+register('L1', l1, l1_batch)
+register('SLICED_EMD', sliced_emd, sliced_emd_batch)
+register('ENTROPIC_EMD', entropic_emd, entropic_emd_batch)
@@ -10,7 +10,7 @@ import functools
 
 import joblib.func_inspect
 
-from . import config, constants, db
+from . import config, constants, db, store
 
 
 def cache(ignore=[]):
@@ -18,8 +18,10 @@ def cache(ignore=[]):
     database."""
 
     def joblib_decorator(func):
-        if func.__name__ == '_big_mip' and not config.CACHE_BIGMIPS:
-            return func
+        if func.__name__ == '_big_mip':
+            if not config.CACHE_BIGMIPS:
+                return func
+            return store_decorator(func)
         return constants.joblib_memory.cache(func, ignore=ignore)
 
     def db_decorator(func):
@@ -35,6 +37,25 @@ def cache(ignore=[]):
         return db_decorator
 
 
+def store_decorator(func):
+    """Memoize ``_big_mip`` with the on-disk |BigMip| store.
+
+    The decorated function must take the subsystem's hash and the subsystem as
+    its arguments; results are keyed by the hash and rebuilt around the
+    subsystem when they are retrieved.
+    """
+    @functools.wraps(func)
+    def wrapper(cache_key, subsystem):
+        cached_value = store.bigmips.load(cache_key, subsystem)
+        if cached_value is not None:
+            return cached_value
+        result = func(cache_key, subsystem)
+        store.bigmips.save(cache_key, result)
+        return result
+
+    return wrapper
+
+
 class DbMemoizedFunc:
 
     """A memoized function, with a databse backing the cache."""
@@ -33,11 +33,17 @@ class BigMip(cmp._Orderable):
         time (float): The number of seconds it took to calculate.
         small_phi_time (float): The number of seconds it took to calculate the
             unpartitioned constellation.
+        unique (bool): Whether the MICE of every constellation that was
+            computed to find this MIP are ``unique`` (see |Mice|). If so, the
+            MIP does not depend on the order in which purviews are searched,
+            and the MIP of a symmetric subsystem is this one with its nodes
+            permuted (see :mod:`pyphi.symmetry`).
     """
 
     def __init__(self, phi=None, unpartitioned_constellation=None,
                  partitioned_constellation=None, subsystem=None,
-                 cut_subsystem=None, time=None, small_phi_time=None):
+                 cut_subsystem=None, time=None, small_phi_time=None,
+                 unique=False):
         self.phi = phi
         self.unpartitioned_constellation = unpartitioned_constellation
         self.partitioned_constellation = partitioned_constellation
@@ -45,6 +51,7 @@ class BigMip(cmp._Orderable):
         self.cut_subsystem = cut_subsystem
         self.time = time
         self.small_phi_time = small_phi_time
+        self.unique = unique
 
     def __repr__(self):
         return fmt.make_repr(self, _bigmip_attributes)
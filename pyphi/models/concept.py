@@ -154,10 +154,16 @@ class Mice(cmp._Orderable):
     ``>``, etc.). First, ``phi`` values are compared. Then, if these are equal
     up to |PRECISION|, the size of the mechanism is compared (exclusion
     principle).
+
+    Attributes:
+        unique (bool): Whether the purview is known to be the only one over
+            which the mechanism is maximally irreducible. If not, which purview
+            is chosen depends on the order in which they are searched.
     """
 
-    def __init__(self, mip):
+    def __init__(self, mip, unique=False):
         self._mip = mip
+        self.unique = unique
 
     @property
     def phi(self):
@@ -311,6 +317,14 @@ class Concept(cmp._Orderable):
             The number of seconds it took to calculate.
     """
 
+    # The memoized result of `emd_hash`.
+    _emd_hash = None
+    # Expanded repertoires, keyed by direction and purview.
+    _expanded_repertoires = None
+    # The distance to the null concept, memoized by
+    # `compute.distance.null_concept_distance`.
+    _null_concept_distance = None
+
     def __init__(self, phi=None, mechanism=None, cause=None, effect=None,
                  subsystem=None, normalized=False, time=None):
         self.phi = phi
@@ -407,20 +421,61 @@ class Concept(cmp._Orderable):
                 and self.mechanism == other.mechanism
                 and self.eq_repertoires(other))
 
+    def emd_hash(self):
+        """Return a hash of the concept that is consistent with
+        :meth:`emd_eq`.
+
+        Concepts that are equal in the context of an EMD calculation have the
+        same hash, so they can be matched through a hash table. The hash is
+        computed once and stored on the concept.
+        """
+        if self._emd_hash is None:
+            def digest(repertoire):
+                if repertoire is None:
+                    return hash(None)
+                # Adding zero turns negative zeros, which compare equal to
+                # zeros but have different bytes, into zeros.
+                return utils.np_hash(repertoire + 0.0)
+
+            self._emd_hash = hash((self.phi, self.mechanism,
+                                   digest(self.cause_repertoire),
+                                   digest(self.effect_repertoire)))
+        return self._emd_hash
+
     # TODO Rename to expanded_cause_repertoire, etc
     def expand_cause_repertoire(self, new_purview=None):
         """Expand a cause repertoire into a distribution over an entire
         network.
         """
-        return self.subsystem.expand_cause_repertoire(
-            self.cause.repertoire, new_purview)
+        return self._expand_repertoire(DIRECTIONS[PAST], self.cause.repertoire,
+                                       new_purview)
 
     def expand_effect_repertoire(self, new_purview=None):
         """Expand an effect repertoire into a distribution over an entire
         network.
         """
-        return self.subsystem.expand_effect_repertoire(
-            self.effect.repertoire, new_purview)
+        return self._expand_repertoire(DIRECTIONS[FUTURE],
+                                       self.effect.repertoire, new_purview)
+
+    def _expand_repertoire(self, direction, repertoire, new_purview):
+        """Expand one of the concept's repertoires, memoizing the result.
+
+        A concept is compared to many others when computing constellation
+        distances, so the same expansions are needed repeatedly. The memoized
+        arrays are read-only.
+        """
+        if new_purview is None:
+            new_purview = self.subsystem.node_indices
+        key = (direction, frozenset(new_purview))
+        if self._expanded_repertoires is None:
+            self._expanded_repertoires = {}
+        if key not in self._expanded_repertoires:
+            expanded = self.subsystem.expand_repertoire(direction, repertoire,
+                                                        new_purview)
+            if expanded is not None:
+                expanded.flags.writeable = False
+            self._expanded_repertoires[key] = expanded
+        return self._expanded_repertoires[key]
 
     def expand_partitioned_cause_repertoire(self):
         """Expand a partitioned cause repertoire into a distribution over an
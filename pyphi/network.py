@@ -10,6 +10,7 @@ context of all |small_phi| and |big_phi| computation.
 import json
 
 import numpy as np
+from scipy.sparse.csgraph import connected_components
 
 from . import cache, convert, utils, validate
 from .constants import DIRECTIONS, FUTURE, PAST
@@ -72,6 +73,10 @@ class Network:
         self._node_indices = tuple(range(self.size))
         self._node_labels = node_labels or default_labels(self._node_indices)
         self.purview_cache = purview_cache or cache.PurviewCache()
+        self.node_tpm_cache = cache.NodeTpmCache()
+        self.macro_pipeline_cache = cache.MacroPipelineCache()
+        self._reachability_cache = cache.DictCache()
+        self._connectivity = _connectivity_bitsets(self._cm)
 
         validate.network(self)
 
@@ -188,6 +193,67 @@ class Network:
         return irreducible_purviews(self.cm, direction, mechanism,
                                     all_purviews)
 
+    @cache.method('_reachability_cache')
+    def _reachability_index(self, state):
+        """Bitsets of the past states of the network from which each node can
+        reach its state in ``state``.
+
+        Bit |i| of a bitset stands for the |ith| past state in LOLI order.
+
+        Returns:
+            tuple[tuple[int]]: For each node, the bitset of the past states
+            after which the node can be in its current state, and the bitset
+            of the past states in which it is in its current state.
+        """
+        past_states = convert._loli_states(self.size)
+        tpm = self.tpm.reshape([-1, self.size], order='F')
+        possible = np.abs(tpm - np.array(state)) < 1
+        unchanged = past_states == np.array(state)
+        return tuple((_bitset(possible[:, i]), _bitset(unchanged[:, i]))
+                     for i in self._node_indices)
+
+    def state_reachable(self, state, nodes):
+        """Return whether the given nodes can be in their current state.
+
+        The state of a subsystem can be reached if, for some past state of
+        the network in which the other nodes are in their current state, each
+        node of the subsystem has a nonzero probability of being in its
+        current state.
+
+        Args:
+            state (tuple[int]): The state of the network.
+            nodes (tuple[int]): The indices of the nodes of the subsystem.
+        """
+        past_states = -1
+        for i, (possible, unchanged) in enumerate(
+                self._reachability_index(tuple(state))):
+            past_states &= possible if i in nodes else unchanged
+        return past_states != 0
+
+    def strongly_connected(self, nodes):
+        """Return whether the subgraph of the network over the given nodes is
+        strongly connected.
+
+        This gives the same result as :func:`pyphi.utils.strongly_connected`
+        for the network's connectivity matrix, but uses bitsets of the inputs
+        and outputs of each node which are computed when the network is
+        created, so it is cheap enough to call for every subset of nodes.
+
+        Args:
+            nodes (tuple[int]): The indices of the nodes.
+        """
+        successors, predecessors, components = self._connectivity
+        nodes = sum(1 << int(i) for i in set(nodes))
+        if not nodes:
+            return True
+        # Every cycle in the subgraph lies within a single strongly connected
+        # component of the network.
+        if not any(nodes & component == nodes for component in components):
+            return False
+        start = nodes & -nodes
+        return (_closure(start, successors, nodes) == nodes and
+                _closure(start, predecessors, nodes) == nodes)
+
     def __repr__(self):
         return 'Network({}, connectivity_matrix={})'.format(self.tpm, self.cm)
 
@@ -223,6 +289,47 @@ class Network:
         return Network(json['tpm'], json['cm'], node_labels=json['labels'])
 
 
+def _bitset(bits):
+    """Return a boolean array as an integer, with bit |i| set if
+    ``bits[i]`` is true."""
+    # Reverse the array so that the padding added by `packbits` ends up in the
+    # least significant bits, then shift it away.
+    padding = -len(bits) % 8
+    packed = np.packbits(bits[::-1]).tobytes()
+    return int.from_bytes(packed, 'big') >> padding
+
+
+def _connectivity_bitsets(cm):
+    """Return the bitsets of the outputs and inputs of each node, and of the
+    nodes in each strongly connected component, of a connectivity matrix."""
+    successors = tuple(_bitset(row) for row in cm.astype(bool))
+    predecessors = tuple(_bitset(column) for column in cm.T.astype(bool))
+    _, labels = connected_components(cm, connection='strong')
+    components = tuple(_bitset(labels == label) for label in set(labels))
+    return successors, predecessors, components
+
+
+def _closure(start, neighbours, nodes):
+    """Return the bitset of the nodes which can be reached from ``start``
+    along edges between ``nodes``.
+
+    Args:
+        start (int): A bitset of the nodes to start from.
+        neighbours (tuple[int]): The bitset of the neighbours of each node.
+        nodes (int): A bitset of the nodes which can be used.
+    """
+    reached = frontier = start
+    while frontier:
+        new = 0
+        while frontier:
+            node = frontier & -frontier
+            new |= neighbours[node.bit_length() - 1]
+            frontier ^= node
+        frontier = new & nodes & ~reached
+        reached |= frontier
+    return reached
+
+
 def irreducible_purviews(cm, direction, mechanism, purviews):
     """Returns all purview which are irreducible for the mechanism.
 
@@ -53,37 +53,21 @@ class Node:
         self._output_indices = utils.get_outputs_from_cm(
             self.index, subsystem.cm)
 
-        # Generate the node's TPM.
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-        # We begin by getting the part of the subsystem's TPM that gives just
-        # the state of this node. This part is still indexed by network state,
-        # but its last dimension will be gone, since now there's just a single
-        # scalar value (this node's state) rather than a state-vector for all
-        # the network nodes.
-        tpm_on = self.subsystem.tpm[..., self.index]
-        # Get the TPM that gives the probability of the node being off, rather
-        # than on.
-        tpm_off = 1 - tpm_on
-
+        # The node's TPM is generated when it is first needed, from the
+        # subsystem's TPM as it is now.
+        self._tpm = None
+        self._subsystem_tpm = subsystem.tpm
         # Subsystem indices to generate TPM from
         if indices is None:
             indices = subsystem.node_indices
-
-        for i in indices:
-            # TODO extend to nonbinary nodes
-            # Marginalize out non-input nodes that are in the subsystem, since
-            # the external nodes have already been dealt with as boundary
-            # conditions in the subsystem's TPM.
-            if i not in self._input_indices:
-                tpm_on = tpm_on.sum(i, keepdims=True) / 2
-                tpm_off = tpm_off.sum(i, keepdims=True) / 2
-
-        # Combine the on- and off-TPM.
-        self.tpm = np.array([tpm_off, tpm_on])
-        # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
-
-        # Make the TPM immutable (for hashing).
-        self.tpm.flags.writeable = False
+        self._indices = indices
+        # The TPMs of nodes of subsystems with the same nodes and the same
+        # state of the external nodes only depend on their inputs, so they
+        # are shared through the network's cache.
+        tpm_key = subsystem._node_tpm_key
+        if tpm_key is not None:
+            tpm_key += (self.index, self._input_indices)
+        self._tpm_key = tpm_key
 
         # Only compute the hash once.
         self._hash = hash((self.index, self.subsystem))
@@ -97,6 +81,51 @@ class Node:
         self._inputs = None
         self._outputs = None
 
+    @property
+    def tpm(self):
+        """np.ndarray: The node's TPM.
+
+        ``tpm[0]`` gives the probability of the node being off, and ``tpm[1]``
+        the probability of it being on, for each state of its inputs.
+        """
+        if self._tpm is None:
+            cache = self.network.node_tpm_cache
+            tpm = cache.get(self._tpm_key) if self._tpm_key else None
+            if tpm is None:
+                tpm = self._generate_tpm()
+                if self._tpm_key:
+                    cache.set(self._tpm_key, tpm)
+            self._tpm = tpm
+            # The subsystem's TPM is no longer needed.
+            self._subsystem_tpm = None
+        return self._tpm
+
+    def _generate_tpm(self):
+        """Generate the node's TPM from the subsystem's TPM."""
+        # We begin by getting the part of the subsystem's TPM that gives just
+        # the state of this node. This part is still indexed by network state,
+        # but its last dimension will be gone, since now there's just a single
+        # scalar value (this node's state) rather than a state-vector for all
+        # the network nodes.
+        tpm_on = self._subsystem_tpm[..., self.index]
+
+        # Marginalize out non-input nodes that are in the subsystem, since the
+        # external nodes have already been dealt with as boundary conditions
+        # in the subsystem's TPM.
+        # TODO extend to nonbinary nodes
+        non_inputs = tuple(i for i in self._indices
+                           if i not in self._input_indices)
+        if non_inputs:
+            tpm_on = tpm_on.mean(non_inputs, keepdims=True)
+
+        # Combine the on- and off-TPM; the probability of the node being off
+        # is the complement of it being on.
+        tpm = np.array([1 - tpm_on, tpm_on])
+
+        # Make the TPM immutable (for hashing).
+        tpm.flags.writeable = False
+        return tpm
+
     @property
     def input_indices(self):
         """The indices of nodes which connect to this node."""
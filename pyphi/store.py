@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# store.py
+
+"""
+An on-disk store for |BigMip| objects, used by the filesystem caching backend.
+
+Rather than pickling whole |BigMip| objects (which include the subsystem, its
+network and TPM, and both constellations), the store splits them into two
+files in ``config.FS_CACHE_DIRECTORY``:
+
+- a data file, to which the repertoires of every concept are appended as raw
+  ``float64`` values and which is read back as a memory-mapped array, and
+- an index file, an append-only log of small records holding the |big_phi|
+  value, the cut, and the structure of the constellations (mechanisms,
+  purviews, partitions, and offsets of repertoires into the data file).
+
+Existence checks and partial loads of |big_phi| and the cut only read the
+index. Since the subsystem is known when looking up a result, it is not stored;
+full |BigMip| objects are rebuilt around the subsystem that is passed in.
+
+Writers hold an exclusive lock while appending, and they append repertoires to
+the data file before appending the record that refers to them to the index, so
+any number of readers can use the store concurrently without locking. A record
+that is only partially written (if a writer is killed) is ignored, and is
+truncated by the next writer.
+"""
+
+import io
+import logging
+import os
+import pickle
+
+import numpy as np
+
+from . import config, constants
+from .models import BigMip, Concept, Constellation, Mice, Mip
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Create a logger for this module.
+log = logging.getLogger(__name__)
+
+_INDEX_FILENAME = 'bigmip_index.pickle'
+_DATA_FILENAME = 'bigmip_repertoires.dat'
+_LOCK_FILENAME = 'bigmip.lock'
+_DTYPE = np.float64
+_ITEMSIZE = np.dtype(_DTYPE).itemsize
+
+
+class _Lock:
+    """An exclusive lock on a file, held while writing to the store."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        self.file = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+        return False
+
+
+class BigMipStore:
+    """A memory-mapped on-disk store of |BigMip| objects.
+
+    Records are keyed by the integer hash of their subsystem.
+
+    Args:
+        directory (str): The directory in which the store's files are kept.
+            It is created when the first result is saved.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.index_path = os.path.join(directory, _INDEX_FILENAME)
+        self.data_path = os.path.join(directory, _DATA_FILENAME)
+        self.lock_path = os.path.join(directory, _LOCK_FILENAME)
+        self._reset()
+
+    def _reset(self):
+        # The records read from the index so far, the byte offset into the
+        # index up to which they were read, and the identity of the index file.
+        self._index = {}
+        self._index_offset = 0
+        self._index_id = None
+        self._data = None
+
+    def _refresh(self):
+        """Read any records which have been added to the index since it was
+        last read."""
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            self._reset()
+            return
+        index_id = (stat.st_dev, stat.st_ino)
+        if index_id != self._index_id:
+            # The index was removed or replaced; start over.
+            self._reset()
+            self._index_id = index_id
+        if stat.st_size <= self._index_offset:
+            return
+        start = self._index_offset
+        with open(self.index_path, 'rb') as f:
+            f.seek(start)
+            buf = io.BytesIO(f.read())
+        while True:
+            try:
+                key, record = pickle.load(buf)
+            except (EOFError, pickle.UnpicklingError, ValueError):
+                # Either the end of the index, or a partially written record.
+                break
+            self._index[key] = record
+            self._index_offset = start + buf.tell()
+
+    def _record(self, key):
+        self._refresh()
+        return self._index.get(key)
+
+    def __contains__(self, key):
+        return self._record(key) is not None
+
+    def __len__(self):
+        self._refresh()
+        return len(self._index)
+
+    def summary(self, key):
+        """Return the |big_phi| value and |Cut| of a stored result without
+        loading its constellations.
+
+        Returns:
+            tuple[float, Cut]: The ``(phi, cut)`` pair, or ``None`` if there is
+            no result with the given key.
+        """
+        record = self._record(key)
+        if record is None:
+            return None
+        return record['phi'], record['cut']
+
+    def load(self, key, subsystem):
+        """Rebuild a stored |BigMip| for the given subsystem.
+
+        Returns:
+            |BigMip|: The |BigMip|, or ``None`` if there is no result with the
+            given key.
+        """
+        record = self._record(key)
+        if record is None:
+            return None
+        if record['cut'] == subsystem.cut:
+            cut_subsystem = subsystem
+        else:
+            cut_subsystem = subsystem.apply_cut(record['cut'])
+        return BigMip(
+            phi=record['phi'],
+            unpartitioned_constellation=self._load_constellation(
+                record['unpartitioned_constellation'], subsystem),
+            partitioned_constellation=self._load_constellation(
+                record['partitioned_constellation'], cut_subsystem),
+            subsystem=subsystem,
+            cut_subsystem=cut_subsystem,
+            time=record['time'],
+            small_phi_time=record['small_phi_time'])
+
+    def save(self, key, big_mip):
+        """Store a |BigMip| with the given key.
+
+        If there is already a result with the key, this does nothing.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with _Lock(self.lock_path):
+            self._refresh()
+            if key in self._index:
+                return
+            # Discard any partially written record at the end of the index.
+            if (os.path.exists(self.index_path) and
+                    os.path.getsize(self.index_path) > self._index_offset):
+                os.truncate(self.index_path, self._index_offset)
+
+            repertoires = []
+            # The offset into the data file of the next repertoire. A
+            # partially written value at the end of the file is discarded.
+            offset = [0]
+            if os.path.exists(self.data_path):
+                offset[0] = os.path.getsize(self.data_path) // _ITEMSIZE
+                os.truncate(self.data_path, offset[0] * _ITEMSIZE)
+
+            def dump_repertoire(repertoire):
+                if repertoire is None:
+                    return None
+                repertoire = np.ascontiguousarray(repertoire, dtype=_DTYPE)
+                ref = (offset[0], repertoire.shape)
+                offset[0] += repertoire.size
+                repertoires.append(repertoire)
+                return ref
+
+            record = {
+                'phi': big_mip.phi,
+                'cut': big_mip.cut,
+                'time': big_mip.time,
+                'small_phi_time': big_mip.small_phi_time,
+                'unpartitioned_constellation': self._dump_constellation(
+                    big_mip.unpartitioned_constellation, dump_repertoire),
+                'partitioned_constellation': self._dump_constellation(
+                    big_mip.partitioned_constellation, dump_repertoire),
+            }
+            # Append the repertoires before the record that refers to them.
+            with open(self.data_path, 'ab') as f:
+                for repertoire in repertoires:
+                    f.write(repertoire.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.index_path, 'ab') as f:
+                pickle.dump((key, record), f,
+                            protocol=constants.PICKLE_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+
+    @staticmethod
+    def _dump_constellation(constellation, dump_repertoire):
+        """Return the structure of a constellation, replacing repertoires with
+        the references returned by ``dump_repertoire``."""
+
+        def dump_mip(mip):
+            return (mip.phi, mip.direction, mip.mechanism, mip.purview,
+                    mip.partition,
+                    dump_repertoire(mip.unpartitioned_repertoire),
+                    dump_repertoire(mip.partitioned_repertoire),
+                    mip.subsystem is not None)
+
+        return [(c.phi, c.mechanism, dump_mip(c.cause.mip),
+                 dump_mip(c.effect.mip), c.normalized, c.time)
+                for c in constellation]
+
+    def _load_constellation(self, concepts, subsystem):
+        """Rebuild a constellation from its stored structure."""
+
+        def load_repertoire(ref):
+            if ref is None:
+                return None
+            offset, shape = ref
+            size = int(np.prod(shape))
+            return self._memmap()[offset:offset + size].reshape(shape)
+
+        def load_mice(mip):
+            (phi, direction, mechanism, purview, partition, unpartitioned,
+             partitioned, has_subsystem) = mip
+            return Mice(Mip(phi=phi,
+                            direction=direction,
+                            mechanism=mechanism,
+                            purview=purview,
+                            partition=partition,
+                            unpartitioned_repertoire=load_repertoire(
+                                unpartitioned),
+                            partitioned_repertoire=load_repertoire(
+                                partitioned),
+                            subsystem=subsystem if has_subsystem else None))
+
+        return Constellation(
+            Concept(phi=phi, mechanism=mechanism, cause=load_mice(cause),
+                    effect=load_mice(effect), subsystem=subsystem,
+                    normalized=normalized, time=time)
+            for phi, mechanism, cause, effect, normalized, time in concepts)
+
+    def _memmap(self):
+        """Return the data file as a memory-mapped array, remapping it if it
+        has grown."""
+        size = os.path.getsize(self.data_path) // _ITEMSIZE
+        if self._data is None or len(self._data) < size:
+            self._data = np.memmap(self.data_path, dtype=_DTYPE, mode='r',
+                                   shape=(size,))
+        return self._data
+
+
+#: The store used by the filesystem caching backend.
+bigmips = BigMipStore(config.FS_CACHE_DIRECTORY)
@@ -8,13 +8,17 @@ import itertools
 
 import numpy as np
 
-from . import cache, config, utils, validate
+from . import cache, config, measures, symmetry, utils, validate
 from .config import PRECISION
 from .constants import DIRECTIONS, FUTURE, PAST
 from .models import Concept, Cut, Mice, Mip, _null_mip, Part, Bipartition
 from .network import irreducible_purviews
 from .node import generate_nodes
 
+# The measures whose batch functions are vectorized, which |find_mip| uses to
+# compare all the partitioned repertoires at once.
+_BATCHED_MEASURES = ('L1', 'SLICED_EMD', 'ENTROPIC_EMD')
+
 
 class Subsystem:
     # TODO! go through docs and make sure to say when things can be None
@@ -94,6 +98,12 @@ class Subsystem:
         # have an accesible object-level cache. Just use a simple memoizer
         self._repertoire_cache = repertoire_cache or cache.DictCache()
 
+        # Node TPMs are shared by subsystems with the same nodes and the same
+        # state of the external nodes (see |Node|).
+        self._node_tpm_key = (self.node_indices,
+                              utils.state_of(self.external_indices,
+                                             self.state))
+
         self.nodes = generate_nodes(self, labels=True)
 
         validate.subsystem(self)
@@ -213,6 +223,46 @@ class Subsystem:
         return Subsystem(self.network, self.state, self.node_indices,
                          cut=cut, mice_cache=self._mice_cache)
 
+    def mice_damaged_by_cut(self, mice):
+        """Return True if the cut of this subsystem affects a |Mice| of the
+        uncut subsystem, in which case the |Mice| cannot be reused.
+
+        Args:
+            mice (|Mice|): A |Mice| of the uncut subsystem.
+        """
+        return mice.damaged_by_cut(self)
+
+    def state_reachable(self):
+        """Return whether the state of the subsystem can be reached according
+        to the network's TPM."""
+        return self.network.state_reachable(self.state, self.node_indices)
+
+    def strongly_connected(self):
+        """Return whether the subsystem is strongly connected."""
+        if self.is_cut:
+            return utils.strongly_connected(self.cm, self.node_indices)
+        return self.network.strongly_connected(self.node_indices)
+
+    def automorphisms(self):
+        """Return permutations generating the automorphisms of the subsystem
+        (see :mod:`pyphi.symmetry`).
+
+        The permutations are of the node indices of the network, and fix the
+        external nodes. The subsystem's TPM is conditioned on the state of the
+        external nodes, so they need not be automorphisms of the network.
+        """
+        nodes = self.node_indices
+        size = len(nodes)
+        tpm = self.tpm[..., nodes].reshape([2] * size + [size])
+        cm = self.cm[np.ix_(nodes, nodes)]
+        automorphisms = []
+        for g in symmetry.automorphisms(tpm, cm, self.proper_state):
+            perm = list(self.network.node_indices)
+            for i, j in zip(nodes, g):
+                perm[i] = nodes[j]
+            automorphisms.append(tuple(perm))
+        return automorphisms
+
     def indices2nodes(self, indices):
         """Return nodes for these indices.
 
@@ -548,6 +598,25 @@ class Subsystem:
                 np.all(unpartitioned_repertoire == 0)):
             return _mip(0, None, None)
 
+        # The approximate measures compare the unpartitioned repertoire with
+        # all the partitioned repertoires at once
+        if (config.MEASURE in _BATCHED_MEASURES and
+                not config.L1_DISTANCE_APPROXIMATION):
+            partitions = mip_bipartitions(mechanism, purview)
+            if not partitions:
+                return mip
+            partitioned_repertoires = [
+                self.partitioned_repertoire(direction, partition)
+                for partition in partitions]
+            phis = measures.batch_distance(direction,
+                                           unpartitioned_repertoire,
+                                           np.stack(partitioned_repertoires))
+            phis = np.round(phis, PRECISION)
+            # The first minimal partition, as in the loop below
+            i = int(np.argmin(phis))
+            return _mip(float(phis[i]), partitions[i],
+                        partitioned_repertoires[i])
+
         # Loop over possible MIP bipartitions
         for partition in mip_bipartitions(mechanism, purview):
             partitioned_repertoire = self.partitioned_repertoire(direction,
@@ -672,12 +741,16 @@ class Subsystem:
         purviews = self._potential_purviews(direction, mechanism, purviews)
 
         if not purviews:
-            max_mip = _null_mip(direction, mechanism, ())
-        else:
-            max_mip = max(self.find_mip(direction, mechanism, purview)
-                          for purview in purviews)
+            return Mice(_null_mip(direction, mechanism, ()), unique=True)
+
+        mips = [self.find_mip(direction, mechanism, purview)
+                for purview in purviews]
+        max_mip = max(mips)
+        ties = [mip for mip in mips
+                if utils.phi_eq(mip.phi, max_mip.phi) and
+                len(mip.purview) == len(max_mip.purview)]
 
-        return Mice(max_mip)
+        return Mice(max_mip, unique=(len(ties) == 1))
 
     def core_cause(self, mechanism, purviews=False):
         """Return the core cause repertoire of a mechanism.
@@ -809,15 +882,15 @@ def effect_emd(d1, d2):
     Returns:
         float: The EMD between ``d1`` and ``d2``.
     """
-    return sum(np.abs(utils.marginal_zero(d1, i) - utils.marginal_zero(d2, i))
-               for i in range(d1.ndim))
+    return measures.emd(DIRECTIONS[FUTURE], d1, d2)
 
 
 def emd(direction, d1, d2):
-    """Compute the EMD between two repertoires for a given direction.
+    """Compute the distance between two repertoires for a given direction.
 
-    The full EMD computation is used for cause repertoires. A fast analytic
-    solution is used for effect repertoires.
+    The measure is set by ``config.MEASURE`` (see :mod:`pyphi.measures`). By
+    default the full EMD computation is used for cause repertoires and a fast
+    analytic solution is used for effect repertoires.
 
     Args:
         direction (str): Either |past| or |future|.
@@ -825,12 +898,6 @@ def emd(direction, d1, d2):
         d2 (np.ndarray): The second repertoire.
 
     Returns:
-        float: The EMD between ``d1`` and ``d2``, rounded to |PRECISION|.
+        float: The distance between ``d1`` and ``d2``, rounded to |PRECISION|.
     """
-
-    if direction == DIRECTIONS[PAST]:
-        func = utils.hamming_emd
-    elif direction == DIRECTIONS[FUTURE]:
-        func = effect_emd
-
-    return round(func(d1, d2), PRECISION)
+    return round(measures.distance(direction, d1, d2), PRECISION)
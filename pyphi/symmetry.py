@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# symmetry.py
+
+"""
+Symmetries of networks and subsystems.
+
+An automorphism of a system is a permutation of its nodes which leaves its
+TPM, its connectivity matrix, and its state unchanged. Permuting the nodes of
+a subsystem by an automorphism of the network gives another subsystem, and
+permuting a cut by an automorphism of the subsystem gives another cut, whose
+constellations are the permuted constellations of the original, as long as no
+mechanism is maximally irreducible over several purviews. When there are such
+ties, the MICE is the first of the tied purviews to be searched, and the order
+of the purviews is not preserved by the permutation, so |big_phi| can differ.
+Whether a |Mice| was chosen among tied purviews is recorded in its ``unique``
+attribute.
+
+When ``config.EXPLOIT_SYMMETRY`` is enabled, :func:`~pyphi.compute.complexes`
+only computes the |BigMip| of one candidate subsystem per orbit under the
+automorphisms of the network, and maps it to the other candidates of the
+orbit with :func:`permute_big_mip`, unless its constellations have ties, in
+which case the other candidates are computed too. Likewise, only one cut per
+orbit under the automorphisms of a subsystem is evaluated when finding its MIP
+(see :func:`~pyphi.compute.big_phi.big_mip_bipartitions`), unless the
+constellations of the subsystem or of that cut have ties, in which case the
+rest of the orbit is evaluated too.
+
+Permutations are represented as tuples ``p`` mapping node ``i`` to node
+``p[i]``.
+"""
+
+import numpy as np
+
+from . import config
+from .models import Concept, Constellation, Cut, Mice, Mip, Part, BigMip
+
+
+def automorphisms(tpm, cm, state):
+    """Return a set of automorphisms generating every automorphism of a
+    system.
+
+    The generators are found by searching, for each node ``i`` in turn, for
+    automorphisms which fix the nodes before ``i`` and map ``i`` to each node
+    it could be mapped to (see the Schreier-Sims algorithm), so only a few
+    permutations are ever checked against the TPM, even for systems with
+    very many automorphisms.
+
+    Args:
+        tpm (np.ndarray): The TPM of the system, in |N-D| state-by-node form.
+        cm (np.ndarray): The connectivity matrix of the system.
+        state (tuple[int]): The state of the system.
+
+    Returns:
+        list[tuple[int]]: The generating automorphisms. The list is empty if
+        the identity is the only automorphism.
+    """
+    tpm, cm, state = np.asarray(tpm), np.asarray(cm), np.asarray(state)
+    n = len(state)
+    # Nodes can only be mapped to nodes with the same invariants.
+    invariants = [
+        (state[i], cm[i, i], cm[i].sum(), cm[:, i].sum(),
+         tuple(np.round(np.sort(tpm[..., i], axis=None), config.PRECISION)))
+        for i in range(n)
+    ]
+
+    def extend(perm, forced):
+        """Return an automorphism which starts with ``perm`` and agrees with
+        ``forced``, or ``None`` if there isn't one."""
+        i = len(perm)
+        if i == n:
+            return tuple(perm) if _preserves_tpm(tpm, perm) else None
+        candidates = [forced[i]] if i < len(forced) else range(n)
+        for j in candidates:
+            if (j in perm or invariants[j] != invariants[i] or
+                    any(cm[i, k] != cm[j, perm[k]] or
+                        cm[k, i] != cm[perm[k], j] for k in range(i))):
+                continue
+            found = extend(perm + [j], forced)
+            if found is not None:
+                return found
+        return None
+
+    generators = []
+    for i in range(n):
+        # The automorphisms found so far which fix the nodes before `i`...
+        stabilizer = [g for g in generators if g[:i] == tuple(range(i))]
+        # ...already map `i` to every node in its orbit under them.
+        orbit = _orbit(i, stabilizer)
+        for j in range(i + 1, n):
+            if j in orbit:
+                continue
+            found = extend([], tuple(range(i)) + (j,))
+            if found is not None:
+                generators.append(found)
+                stabilizer.append(found)
+                orbit = _orbit(i, stabilizer)
+    return generators
+
+
+def _preserves_tpm(tpm, perm):
+    """Return whether permuting the nodes of an |N-D| TPM by ``perm`` leaves
+    it unchanged."""
+    permuted = np.transpose(tpm[..., perm], list(perm) + [len(perm)])
+    return np.allclose(permuted, tpm)
+
+
+def _orbit(node, generators):
+    """Return the set of nodes which ``node`` is mapped to by the group
+    generated by ``generators``."""
+    orbit = {node}
+    frontier = [node]
+    while frontier:
+        i = frontier.pop()
+        for g in generators:
+            if g[i] not in orbit:
+                orbit.add(g[i])
+                frontier.append(g[i])
+    return orbit
+
+
+def permute(perm, nodes):
+    """Return the indices of the given nodes after permuting them."""
+    return tuple(sorted(perm[i] for i in nodes))
+
+
+def orbits(subsets, generators, size):
+    """Group subsets of nodes by their orbits under a group of permutations.
+
+    Args:
+        subsets (Iterable[tuple[int]]): The subsets of nodes.
+        generators (list[tuple[int]]): Permutations generating the group.
+        size (int): The number of nodes permuted.
+
+    Returns:
+        dict: A dictionary mapping each subset, and every subset in the orbit
+        of one, to a pair of the representative of its orbit (the first subset
+        of the orbit in ``subsets``) and a permutation mapping the
+        representative to it.
+    """
+    identity = tuple(range(size))
+    result = {}
+    for subset in subsets:
+        if subset in result:
+            continue
+        result[subset] = (subset, identity)
+        frontier = [subset]
+        while frontier:
+            current = frontier.pop()
+            perm = result[current][1]
+            for g in generators:
+                image = permute(g, current)
+                if image not in result:
+                    result[image] = (subset, tuple(g[i] for i in perm))
+                    frontier.append(image)
+    return result
+
+
+def permute_cut(perm, cut):
+    """Return the image of a cut under a permutation of the nodes."""
+    return Cut(permute(perm, cut.severed), permute(perm, cut.intact))
+
+
+def cut_orbit(cut, generators):
+    """Return the orbit of a cut under a group of permutations, starting with
+    the cut itself.
+
+    Args:
+        cut (|Cut|): The cut.
+        generators (list[tuple[int]]): Permutations generating the group.
+    """
+    orbit = [cut]
+    seen = {cut}
+    for current in orbit:
+        for g in generators:
+            image = permute_cut(g, current)
+            if image not in seen:
+                seen.add(image)
+                orbit.append(image)
+    return orbit
+
+
+def cut_representatives(cuts, generators):
+    """Return the first cut of each orbit of cuts under a group of
+    permutations, in order.
+
+    Args:
+        cuts (Iterable[|Cut|]): The cuts.
+        generators (list[tuple[int]]): Permutations generating the group.
+    """
+    representatives = []
+    seen = set()
+    for cut in cuts:
+        if cut not in seen:
+            representatives.append(cut)
+            seen.update(cut_orbit(cut, generators))
+    return representatives
+
+
+def unique_mice(constellation):
+    """Return whether the MICE of every concept of a constellation are
+    ``unique`` (see |Mice|).
+
+    The MICE of a mechanism are chosen among tied purviews by the order in
+    which they are searched, which is not preserved by permuting the nodes.
+    So constellations are only known to be permuted along with the nodes of
+    the system if they have no such ties.
+    """
+    return all(concept.cause.unique and concept.effect.unique
+               for concept in constellation)
+
+
+# Mapping results to symmetric subsystems
+# =============================================================================
+
+def _permute_repertoire(perm, repertoire):
+    """Permute the axes of a repertoire over the nodes of the network."""
+    if repertoire is None:
+        return None
+    inverse = np.argsort(perm)
+    return np.transpose(repertoire, inverse)
+
+
+def _permute_mip(perm, mip, subsystem):
+    partition = mip.partition
+    if partition is not None:
+        partition = type(partition)(*(
+            Part(permute(perm, part.mechanism), permute(perm, part.purview))
+            for part in partition))
+    return Mip(phi=mip.phi,
+               direction=mip.direction,
+               mechanism=permute(perm, mip.mechanism),
+               purview=permute(perm, mip.purview),
+               partition=partition,
+               unpartitioned_repertoire=_permute_repertoire(
+                   perm, mip.unpartitioned_repertoire),
+               partitioned_repertoire=_permute_repertoire(
+                   perm, mip.partitioned_repertoire),
+               subsystem=subsystem)
+
+
+def _permute_constellation(perm, constellation, subsystem):
+    concepts = [
+        Concept(phi=concept.phi,
+                mechanism=permute(perm, concept.mechanism),
+                cause=Mice(_permute_mip(perm, concept.cause.mip, subsystem),
+                         concept.cause.unique),
+                effect=Mice(_permute_mip(perm, concept.effect.mip, subsystem),
+                           concept.effect.unique),
+                subsystem=subsystem,
+                normalized=concept.normalized,
+                time=concept.time)
+        for concept in constellation
+    ]
+    concepts.sort(key=lambda concept: (len(concept.mechanism),
+                                       concept.mechanism))
+    return Constellation(concepts)
+
+
+def permute_big_mip(perm, big_mip, subsystem):
+    """Return the |BigMip| of a subsystem which is the image of the subsystem
+    of ``big_mip`` under an automorphism of the network.
+
+    Args:
+        perm (tuple[int]): The automorphism.
+        big_mip (|BigMip|): The |BigMip| to permute.
+        subsystem (|Subsystem|): The permuted subsystem.
+
+    The concepts of the permuted constellations are ordered by mechanism, as
+    :func:`~pyphi.compute.constellation` orders them. The result is only the
+    |BigMip| that would be computed directly if ``big_mip`` is ``unique``, and
+    even then its cut may be another of the minimal cuts.
+    """
+    cut = permute_cut(perm, big_mip.cut)
+    if cut == subsystem.null_cut:
+        cut_subsystem = subsystem
+    else:
+        cut_subsystem = subsystem.apply_cut(cut)
+    return BigMip(
+        phi=big_mip.phi,
+        unpartitioned_constellation=_permute_constellation(
+            perm, big_mip.unpartitioned_constellation, subsystem),
+        partitioned_constellation=_permute_constellation(
+            perm, big_mip.partitioned_constellation, cut_subsystem),
+        subsystem=subsystem,
+        cut_subsystem=cut_subsystem,
+        time=big_mip.time,
+        small_phi_time=big_mip.small_phi_time,
+        unique=big_mip.unique)
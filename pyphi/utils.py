@@ -18,7 +18,7 @@ from itertools import chain, combinations
 from pyemd import emd
 from scipy.misc import comb
 from scipy.spatial.distance import cdist
-from scipy.sparse import csc_matrix
+from scipy.sparse import csc_matrix, csr_matrix, issparse
 from scipy.sparse.csgraph import connected_components
 
 from . import constants, convert
@@ -53,6 +53,11 @@ def all_states(n):
 # Methods for converting the time scale of the tpm
 # ================================================
 
+# The largest fraction of non-zero entries of a state-by-state TPM that is
+# stored as a sparse matrix by `run_tpm`.
+_SPARSE_DENSITY = 0.1
+
+
 def sparse(matrix, threshold=0.1):
     return np.sum(matrix > 0) / matrix.size > threshold
 
@@ -66,21 +71,59 @@ def dense_time(tpm, time_scale):
     return np.linalg.matrix_power(tpm, time_scale)
 
 
-def run_tpm(tpm, time_scale):
+def _tpm_power(powers, time_scale):
+    """Return a power of a state-by-state TPM.
+
+    The power is computed from lower powers, which are computed recursively
+    by squaring, and is added to ``powers`` along with them.
+    """
+    if time_scale not in powers:
+        if time_scale - 1 in powers:
+            exponents = (time_scale - 1, 1)
+        else:
+            exponents = (time_scale // 2, time_scale - time_scale // 2)
+        a, b = (_tpm_power(powers, exponent) for exponent in exponents)
+        if issparse(a) != issparse(b):
+            a, b = (m.toarray() if issparse(m) else m for m in (a, b))
+        power = a.dot(b)
+        # Powers of sparse TPMs tend to fill in.
+        if issparse(power) and power.nnz > _SPARSE_DENSITY * np.prod(
+                power.shape):
+            power = power.toarray()
+        powers[time_scale] = power
+    return powers[time_scale]
+
+
+def run_tpm(tpm, time_scale, powers=None):
     """Iterate a tpm by the specified number of time steps.
 
+    The state-by-state TPM is raised to the power of the time scale by
+    repeated squaring. Sparse TPMs, such as those of deterministic networks,
+    are kept in sparse form for as long as their powers stay sparse.
+
     Args:
         tpm (np.ndarray): A state-by-node tpm.
         time_scale (int): The number of steps to run the tpm.
 
+    Keyword Args:
+        powers (dict): The powers of the state-by-state form of ``tpm``
+            computed so far, keyed by exponent. Powers computed by this call
+            are added to it, so that it can be passed again to run the same
+            tpm for a different number of steps.
+
     Returns:
         np.ndarray
     """
-    sbs_tpm = convert.state_by_node2state_by_state(tpm)
-    if sparse(tpm):
-        tpm = sparse_time(sbs_tpm, time_scale)
-    else:
-        tpm = dense_time(sbs_tpm, time_scale)
+    if powers is None:
+        powers = {}
+    if not powers:
+        sbs_tpm = convert.state_by_node2state_by_state(tpm)
+        if np.count_nonzero(sbs_tpm) <= _SPARSE_DENSITY * sbs_tpm.size:
+            sbs_tpm = csr_matrix(sbs_tpm)
+        powers[1] = sbs_tpm
+    tpm = _tpm_power(powers, time_scale)
+    if issparse(tpm):
+        tpm = tpm.toarray()
     return convert.state_by_state2state_by_node(tpm)
 
 
@@ -11,6 +11,10 @@ import numpy as np
 from . import config, constants, convert, exceptions, utils
 from .constants import EPSILON
 
+# The number of entries of a state-by-state TPM checked at once for
+# conditional independence.
+_INDEPENDENCE_BLOCK_SIZE = 2**16
+
 
 def direction(direction):
     """Validate that the given direction is one of the allowed constants."""
@@ -59,20 +63,28 @@ def tpm(tpm):
 
 
 def conditionally_independent(tpm):
-    """Validate that the TPM is conditionally independent."""
+    """Validate that the TPM is conditionally independent.
+
+    A state-by-node TPM is conditionally independent by construction. A
+    state-by-state TPM is conditionally independent if every row is the
+    product of the marginal distributions of the nodes, which is checked
+    directly, a block of rows at a time, stopping at the first block with a
+    row that does not factorize.
+    """
     tpm = np.array(tpm)
-    if tpm.ndim > 1:
-        if utils.state_by_state(tpm):
-            there_and_back_again = convert.state_by_node2state_by_state(
-                convert.state_by_state2state_by_node(tpm))
-        else:
-            there_and_back_again = convert.state_by_state2state_by_node(
-                convert.state_by_node2state_by_state(tpm))
-
-        if np.any((tpm - there_and_back_again) >= EPSILON):
-            raise exceptions.ConditionallyDependentError(
-                'TPM is not conditionally independent. See the conditional '
-                'independence example in the documentation for more info')
+    if tpm.ndim > 1 and utils.state_by_state(tpm):
+        S = tpm.shape[-1]
+        N = int(np.log2(S))
+        states = convert._loli_states(N)
+        chunk_size = max(1, _INDEPENDENCE_BLOCK_SIZE // S)
+        for i in range(0, S, chunk_size):
+            rows = tpm[i:i + chunk_size]
+            factorized = convert._joint_probabilities(rows.dot(states))
+            if np.any((rows - factorized) >= EPSILON):
+                raise exceptions.ConditionallyDependentError(
+                    'TPM is not conditionally independent. See the '
+                    'conditional independence example in the documentation '
+                    'for more info')
 
     return True
 
@@ -145,16 +157,8 @@ def state_length(state, size):
 
 
 def state_reachable(subsystem):
-    """Return whether a state can be reached according to the network's TPM."""
-    # If there is a row `r` in the TPM such that all entries of `r - state` are
-    # between -1 and 1, then the given state has a nonzero probability of being
-    # reached from some state.
-    # First we take the submatrix of the conditioned TPM that corresponds to
-    # the nodes that are actually in the subsystem...
-    tpm = subsystem.tpm[..., subsystem.node_indices]
-    # Then we do the subtraction and test.
-    test = tpm - np.array(subsystem.proper_state)
-    if not np.any(np.logical_and(-1 < test, test < 1).all(-1)):
+    """Check that a state can be reached according to the network's TPM."""
+    if not subsystem.state_reachable():
         raise exceptions.StateUnreachableError(subsystem.state)
 
 
@@ -2,17 +2,24 @@
 # -*- coding: utf-8 -*-
 # test_big_phi.py
 
+import importlib
 import pickle
+
+import numpy as np
 import pytest
 from unittest.mock import patch
 
-from pyphi import constants, config, compute, models, utils, Network, Subsystem
+from pyphi import (checkpoint, constants, config, compute, examples, exceptions,
+                   models, utils, Network, Subsystem)
 from pyphi.constants import DIRECTIONS, PAST, FUTURE
 from pyphi.models import Cut, _null_bigmip
 from pyphi.compute import constellation
 from pyphi.compute.big_phi import (_find_mip_parallel, _find_mip_sequential,
                                    big_mip_bipartitions)
 
+# `pyphi.compute.big_phi` is shadowed by the function of the same name.
+big_phi_module = importlib.import_module('pyphi.compute.big_phi')
+
 # TODO: split these into `concept` and `big_phi` tests
 
 # Answers
@@ -275,6 +282,27 @@ def test_constellation_distance_uses_simple_vs_emd(mock_emd_distance,
     assert mock_simple_distance.called is False
 
 
+def test_concept_distance_matrix(s_noised):
+    from pyphi.compute import distance
+    C1 = compute.constellation(s_noised)
+    C2 = compute.constellation(s_noised.apply_cut(Cut((0,), (1, 2))))
+    expected = [[distance.concept_distance(c1, c2) for c2 in C2] for c1 in C1]
+    assert np.allclose(distance.concept_distance_matrix(C1, C2), expected)
+    assert distance.concept_distance_matrix(C1, ()).shape == (len(C1), 0)
+
+
+def test_null_concept_distance_is_memoized(s):
+    from pyphi.compute import distance
+    c = compute.concept(s, (0, 1))
+    expected = distance.concept_distance(c, s.null_concept)
+    distance.precompute_distances([c])
+    with patch.object(distance, 'concept_distance') as concept_distance:
+        assert distance.null_concept_distance(c) == expected
+    assert not concept_distance.called
+    # Expanded repertoires are memoized too.
+    assert c.expand_cause_repertoire() is c.expand_cause_repertoire()
+
+
 def test_conceptual_information(s, flushcache, restore_fs_cache):
     flushcache()
     assert compute.conceptual_information(s) == 2.8125
@@ -376,22 +404,127 @@ def test_find_mip_parallel_noised_example(s_noised, flushcache,
     check_mip(mip, noised_answer)
 
 
+@config.override(PARALLEL_CUT_EVALUATION=True, NUMBER_OF_CORES=1,
+                 SUMMARIZE_CUT_EVALUATION=True)
+def test_find_mip_parallel_summary_mode(s_noised, flushcache,
+                                        restore_fs_cache):
+    flushcache()
+    unpartitioned_constellation = constellation(s_noised)
+    cuts = big_mip_bipartitions(s_noised.node_indices)
+    min_mip = _null_bigmip(s_noised)
+    min_mip.phi = float('inf')
+    mip = _find_mip_parallel(s_noised, cuts, unpartitioned_constellation, min_mip)
+    check_mip(mip, noised_answer)
+
+
 def test_possible_complexes(s):
     assert list(compute.possible_complexes(s.network, s.state)) == [
         Subsystem(s.network, s.state, (1,)),
-        Subsystem(s.network, s.state, (0, 1)),
         Subsystem(s.network, s.state, (0, 2)),
         Subsystem(s.network, s.state, (1, 2)),
         Subsystem(s.network, s.state, (0, 1, 2)),
     ]
 
 
+def test_subsystems_skip_unreachable_states():
+    network = examples.fig16()
+    skipped = 0
+    for state in utils.all_states(network.size):
+        expected = []
+        for subset in utils.powerset(network.node_indices):
+            try:
+                expected.append(Subsystem(network, state, subset))
+            except exceptions.StateUnreachableError:
+                skipped += 1
+        assert list(compute.subsystems(network, state)) == expected
+    assert skipped > 0
+
+
 def test_complexes_standard(s, flushcache, restore_fs_cache):
     flushcache()
     complexes = list(compute.complexes(s.network, s.state))
     check_mip(complexes[2], standard_answer)
 
 
+def test_stream_complexes_standard(s, flushcache, restore_fs_cache):
+    flushcache()
+    results = list(compute.stream_complexes(s.network, s.state))
+    mips = [mip for mip, progress in results]
+    assert tuple(filter(None, mips)) == compute.complexes(s.network, s.state)
+
+    total = len(list(compute.possible_complexes(s.network, s.state)))
+    for i, (mip, progress) in enumerate(results):
+        assert progress.finished == i + 1
+        assert progress.total == total
+        assert progress.best == max(mips[:i + 1])
+    assert progress.remaining == 0
+    check_mip(progress.best, standard_answer)
+
+
+@config.override(PARALLEL_CUT_EVALUATION=False)
+def test_big_mip_resumes_from_checkpoint(s, tmpdir, flushcache,
+                                         restore_fs_cache):
+    flushcache()
+    with config.override(CHECKPOINT_RESULTS=True,
+                         CHECKPOINT_DIRECTORY=str(tmpdir)):
+        checkpoint_ = checkpoint.Checkpoint(s)
+        unpartitioned_constellation = constellation(s)
+        cuts = big_mip_bipartitions(s.cut_indices)
+        # Simulate a run that was interrupted after evaluating two cuts.
+        for cut in cuts[:2]:
+            mip = compute.evaluate_cut(s, cut, unpartitioned_constellation)
+            checkpoint_.save_cut(cut, mip.phi)
+        checkpoint_.flush()
+        assert set(checkpoint_.finished_cuts()) == set(cuts[:2])
+
+        with patch.object(big_phi_module, 'evaluate_cut',
+                          wraps=compute.evaluate_cut) as evaluate_cut:
+            mip = compute.big_mip(s)
+        evaluated = [call[0][1] for call in evaluate_cut.call_args_list]
+        assert evaluated == cuts[2:]
+        check_mip(mip, standard_answer)
+        # Finished subsystems replace the records of their cuts.
+        assert checkpoint_.finished_cuts() == {}
+        assert checkpoint_.big_mip() == mip
+
+        with patch.object(big_phi_module, 'evaluate_cut') as evaluate_cut:
+            assert compute.big_mip(s) == mip
+        assert not evaluate_cut.called
+
+
+@config.override(PARALLEL_CUT_EVALUATION=False)
+def test_checkpoint_writes_cuts_in_batches(s, tmpdir, flushcache,
+                                           restore_fs_cache):
+    flushcache()
+    with config.override(CHECKPOINT_RESULTS=True,
+                         CHECKPOINT_DIRECTORY=str(tmpdir),
+                         CHECKPOINT_INTERVAL=3600):
+        checkpoint_ = checkpoint.Checkpoint(s)
+        cuts = big_mip_bipartitions(s.cut_indices)
+        for cut in cuts:
+            checkpoint_.save_cut(cut, 1.0)
+        # Nothing is written until the interval has passed...
+        assert checkpoint.Checkpoint(s).finished_cuts() == {}
+        assert set(checkpoint_.finished_cuts()) == set(cuts)
+        # ...and then every pending cut is written at once.
+        checkpoint_.flush()
+        assert len(tmpdir.listdir()[0].join('cuts').listdir()) == 1
+        assert set(checkpoint.Checkpoint(s).finished_cuts()) == set(cuts)
+        checkpoint.clear(str(tmpdir))
+
+        # Cuts finished before an interruption are written.
+        evaluate_cut = compute.evaluate_cut
+
+        def interrupted(subsystem, cut, *args, **kwargs):
+            if cut == cuts[2]:
+                raise KeyboardInterrupt
+            return evaluate_cut(subsystem, cut, *args, **kwargs)
+        with patch.object(big_phi_module, 'evaluate_cut', interrupted):
+            with pytest.raises(KeyboardInterrupt):
+                compute.big_mip(s)
+        assert set(checkpoint.Checkpoint(s).finished_cuts()) == set(cuts[:2])
+
+
 # TODO!! add more assertions for the smaller subsystems
 def test_all_complexes_standard(s, flushcache, restore_fs_cache):
     flushcache()
@@ -136,3 +136,17 @@ def test_n_d_state_by_node2state_by_state():
     print("Expected:")
     print(expected)
     assert np.array_equal(result, expected)
+
+
+def test_chunked_conversions():
+    np.random.seed(0)
+    sbn = np.random.rand(32, 5)
+    sbs = convert.state_by_node2state_by_state(sbn)
+    assert np.allclose(sbs.sum(1), 1)
+    out = np.zeros_like(sbs)
+    result = convert.state_by_node2state_by_state(sbn, chunk_size=3, out=out)
+    assert result is out
+    assert np.allclose(result, sbs)
+    assert np.allclose(
+        convert.state_by_state2state_by_node(sbs, chunk_size=7),
+        convert.to_n_dimensional(sbn))
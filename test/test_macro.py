@@ -5,7 +5,7 @@
 import pytest
 
 import numpy as np
-from pyphi import convert, macro
+from pyphi import convert, macro, utils
 
 
 def test_all_partitions():
@@ -28,6 +28,13 @@ def test_all_partitions():
     ]
 
 
+def test_all_partitions_for_any_number_of_nodes():
+    # Bell numbers, less the partition into singletons
+    assert [len(list(macro.all_partitions(range(n))))
+            for n in range(1, 11)] == [
+        1, 1, 4, 14, 51, 202, 876, 4139, 21146, 115974]
+
+
 def test_all_groupings():
     assert list(macro.all_groupings(())) == [()]
     partition = ((0, 1), (2, 3))
@@ -101,6 +108,16 @@ def test_make_mapping():
     assert np.array_equal(mapping, np.array((0., 1., 1., 1., 1., 1., 1., 0.)))
 
 
+def test_make_mapping_matches_macro_state():
+    partition = ((3, 1), (4,))
+    grouping = (((0, 2), (1,)), ((1,), (0,)))
+    coarse_grain = macro.CoarseGrain(partition, grouping)
+    mapping = coarse_grain.make_mapping()
+    for i, micro_state in enumerate(utils.all_states(3)):
+        macro_state = coarse_grain.macro_state(micro_state)
+        assert mapping[i] == convert.state2loli_index(macro_state)
+
+
 def test_make_macro_tpm():
     answer_tpm = convert.state_by_state2state_by_node(np.array([
         [0.375,  0.375,  0.125,  0.125],
@@ -201,3 +218,32 @@ def test_rebuild_system_tpm():
          [0, 1]]
     ])
     assert np.array_equal(macro.rebuild_system_tpm(node_tpms), answer)
+
+
+def test_canonical_form():
+    np.random.seed(0)
+    tpm = convert.to_n_dimensional(np.random.rand(8, 3))
+    cm = np.array([[0, 1, 1],
+                   [1, 0, 0],
+                   [1, 1, 1]])
+    state = (1, 0, 0)
+    form, permutations = macro.canonical_form(tpm, cm, state)
+    for permutation in [(1, 2, 0), (2, 0, 1), (0, 2, 1)]:
+        permuted = macro._permute(tpm, cm, state, permutation)
+        assert macro.canonical_form(*permuted)[0] == form
+    assert macro._form(*macro._permute(tpm, cm, state,
+                                       permutations[0])) == form
+    # A different state is a different system.
+    assert macro.canonical_form(tpm, cm, (0, 0, 1))[0] != form
+
+
+def test_canonical_form_bounds_arrangements():
+    # Eight identical, unconnected nodes have 8! orderings, too many to
+    # compare, so they are left in their original order.
+    n = 8
+    tpm = np.full([2] * n + [n], 0.5)
+    cm = np.zeros([n, n])
+    state = (0,) * n
+    form, permutations = macro.canonical_form(tpm, cm, state)
+    assert permutations == [tuple(range(n))]
+    assert form == macro._form(tpm, cm, state)
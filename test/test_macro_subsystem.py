@@ -84,6 +84,18 @@ def test_macro_cut_subsystem(macro_subsystem):
                   < pyphi.constants.EPSILON)
 
 
+def test_macro_cut_subsystem_reuses_mice(macro_subsystem):
+    # Micro element 0 only outputs to macro element 1
+    cause = macro_subsystem.core_cause((0,))
+    effect = macro_subsystem.core_effect((0,))
+    cut = pyphi.models.Cut((0,), (1, 2, 3))
+    cut_subsystem = macro_subsystem.apply_cut(cut)
+    assert not cut_subsystem.mice_damaged_by_cut(cause)
+    assert cut_subsystem.mice_damaged_by_cut(effect)
+    assert cut_subsystem.core_cause((0,)) is cause
+    assert cut_subsystem.core_effect((0,)) is not effect
+
+
 # Tests for purely temporal blackboxing
 # =====================================
 
@@ -184,6 +196,15 @@ def test_run_tpm():
     assert np.array_equal(utils.run_tpm(tpm, 2), answer)
 
 
+def test_run_tpm_reuses_powers(s):
+    powers = {}
+    for time_scale in [4, 5, 3]:
+        tpm = utils.run_tpm(s.tpm, time_scale, powers)
+        answer = np.linalg.matrix_power(sbn2sbs(s.tpm), time_scale)
+        assert np.allclose(tpm, sbs2sbn(answer))
+    assert sorted(powers) == [1, 2, 3, 4, 5]
+
+
 def test_init_subsystem_in_time(s):
     time_subsys = macro.MacroSubsystem(s.network, s.state, s.node_indices,
                                        time_scale=2)
@@ -213,6 +234,25 @@ def test_macro_cut_is_for_micro_indices(s):
                              cut=models.Cut((0,), (1,)))
 
 
+def test_pipeline_stages_are_memoized(s):
+    coarse_grains = [
+        macro.CoarseGrain(((0, 1), (2,)), (((0, 2), (1,)), ((0,), (1,)))),
+        macro.CoarseGrain(((0, 2), (1,)), (((0,), (1, 2)), ((0,), (1,))))]
+    s.network.macro_pipeline_cache.clear()
+    first = [macro.MacroSubsystem(s.network, s.state, s.node_indices,
+                                  time_scale=2, coarse_grain=coarse_grain)
+             for coarse_grain in coarse_grains]
+    # The second system reuses the squeezed TPM, the powers of the TPM, and
+    # the TPM over time
+    assert s.network.macro_pipeline_cache.info() == (3, 3, 3)
+    s.network.macro_pipeline_cache.clear()
+    second = [macro.MacroSubsystem(s.network, s.state, s.node_indices,
+                                   time_scale=2, coarse_grain=coarse_grain)
+              for coarse_grain in reversed(coarse_grains)]
+    for a, b in zip(first, reversed(second)):
+        assert np.array_equal(a.tpm, b.tpm)
+
+
 def test_subsystem_equality(s):
     state = (0, 0, 0)
     macro_subsys = macro.MacroSubsystem(s.network, state, s.node_indices)
@@ -325,6 +365,47 @@ def test_blackbox_emergence():
     assert result.emergence == 0.599789
 
 
+def test_stream_emergence():
+    network = pyphi.examples.basic_network()
+    state = (1, 0, 0)
+    results = list(macro.stream_emergence(network, state, micro_phi=0.0))
+    # Candidates which are not conditionally independent are skipped.
+    indices = [index for index, _, _ in results]
+    assert len(set(indices)) == len(indices)
+    progress = results[-1][2]
+    assert progress.finished <= progress.total
+    assert progress.best.phi == max(m.phi for _, m, _ in results)
+    for _, macro_network, _ in results:
+        subsystem = macro.MacroSubsystem(
+            network, state, macro_network.system,
+            coarse_grain=macro_network.coarse_grain)
+        assert macro_network.phi == pyphi.compute.big_phi(subsystem)
+
+    result = macro.emergence(network, state)
+    assert result.phi == progress.best.phi == 0.520834
+    with pyphi.config.override(PARALLEL_MACRO_EVALUATION=True):
+        parallel_result = macro.emergence(network, state)
+    assert parallel_result.phi == result.phi
+    assert parallel_result.coarse_grain == result.coarse_grain
+
+
+def test_stream_emergence_is_lazy(monkeypatch):
+    built = []
+    macro_system = macro._macro_system
+
+    def counting_macro_system(candidate, network, state):
+        built.append(candidate)
+        return macro_system(candidate, network, state)
+    monkeypatch.setattr(macro, '_macro_system', counting_macro_system)
+
+    network = pyphi.examples.basic_network()
+    results = macro.stream_emergence(network, (1, 0, 0), micro_phi=0.0)
+    first, _, _ = next(results)
+    # Only the candidates up to the first valid one have been built, once.
+    assert len(built) == first + 1
+    assert len(set(c[0] for c in built)) == len(built)
+
+
 def test_macro2micro(s):
     # Only blackboxing
     blackbox = macro.Blackbox(((0, 2), (1,)), (1, 2))
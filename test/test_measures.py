@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# test_measures.py
+
+import numpy as np
+import pytest
+
+from pyphi import compute, config, examples, measures, subsystem, utils
+from pyphi.constants import DIRECTIONS, FUTURE, PAST
+from pyphi.subsystem import effect_emd
+
+
+@pytest.mark.parametrize('measure', sorted(measures.registry))
+def test_distance_uses_configured_measure(s, measure):
+    purview = s.node_indices
+    c1 = s.cause_repertoire((0,), purview)
+    c2 = s.cause_repertoire((1,), purview)
+    with config.override(MEASURE=measure):
+        assert measures.distance(DIRECTIONS[PAST], c1, c2) == measures.get(
+            measure).distance(DIRECTIONS[PAST], c1, c2)
+
+
+@pytest.mark.parametrize('measure', sorted(measures.registry))
+def test_batch_matches_distance(s, measure):
+    purview = s.node_indices
+    for direction in DIRECTIONS:
+        if direction == DIRECTIONS[PAST]:
+            repertoire = s.cause_repertoire
+        else:
+            repertoire = s.effect_repertoire
+        repertoires = np.stack([repertoire((i,), purview)
+                                for i in s.node_indices])
+        with config.override(MEASURE=measure):
+            batch = measures.batch_distance(direction, repertoires[0],
+                                            repertoires)
+            single = [measures.distance(direction, repertoires[0], r)
+                      for r in repertoires]
+        assert np.allclose(batch, single)
+
+
+@pytest.mark.parametrize('measure', ['L1', 'SLICED_EMD', 'ENTROPIC_EMD'])
+def test_batched_find_mip_matches_loop(s, measure, monkeypatch):
+    mechanisms = list(utils.powerset(s.node_indices))
+    with config.override(MEASURE=measure):
+        batched = [s.find_mip(direction, mechanism, purview)
+                   for direction in DIRECTIONS
+                   for mechanism in mechanisms for purview in mechanisms]
+        monkeypatch.setattr(subsystem, '_BATCHED_MEASURES', ())
+        looped = [s.find_mip(direction, mechanism, purview)
+                  for direction in DIRECTIONS
+                  for mechanism in mechanisms for purview in mechanisms]
+    assert batched == looped
+
+
+def test_measures(s):
+    purview = s.node_indices
+    c1 = s.cause_repertoire((0,), purview)
+    c2 = s.cause_repertoire((1,), purview)
+    exact = utils.hamming_emd(c1, c2)
+    assert measures.emd(DIRECTIONS[PAST], c1, c2) == exact
+    assert measures.l1(DIRECTIONS[PAST], c1, c2) == utils.l1(c1, c2)
+    # The sliced EMD is a lower bound on the EMD.
+    assert measures.sliced_emd(DIRECTIONS[PAST], c1, c2) <= exact + 1e-4
+    assert measures.entropic_emd(DIRECTIONS[PAST], c1, c2) == pytest.approx(
+        exact, abs=1e-3)
+
+    e1 = s.effect_repertoire((0,), purview)
+    e2 = s.effect_repertoire((1,), purview)
+    for measure in ['EMD', 'SLICED_EMD', 'ENTROPIC_EMD']:
+        assert measures.get(measure).distance(
+            DIRECTIONS[FUTURE], e1, e2) == pytest.approx(effect_emd(e1, e2))
+
+
+def test_unknown_measure(s):
+    with config.override(MEASURE='BOGUS'):
+        with pytest.raises(ValueError):
+            s.phi((0,), s.node_indices)
+
+
+def test_measure_is_part_of_cache_keys(flushcache, restore_fs_cache):
+    s = examples.basic_subsystem()
+    assert compute.big_phi(s) == 2.3125
+    with config.override(MEASURE='L1'):
+        assert compute.big_phi(s) != 2.3125
+    assert compute.big_phi(s) == 2.3125
+
+
+def test_screen_main_complexes(flushcache, restore_fs_cache):
+    candidates = [(examples.basic_network(), (1, 0, 0)),
+                  (examples.xor_network(), (0, 0, 0)),
+                  (examples.residue_network(), (0, 0, 0, 0, 0))]
+    results = compute.screen_main_complexes(candidates, top=1)
+    assert len(results) == 3
+    confirmed = [exact for _, exact in results if exact is not None]
+    assert len(confirmed) == 1
+    best = max(range(3), key=lambda i: results[i][0].phi)
+    assert results[best][1] == compute.main_complex(*candidates[best])
@@ -466,6 +466,23 @@ def test_concept_hashing(s):
     hash(concept)
 
 
+def test_concept_emd_hash(s, subsys_n1n2):
+    def concept(repertoire, phi=1.0, subsystem=s):
+        mice = models.Mice(mip(phi=phi, unpartitioned_repertoire=repertoire))
+        return models.Concept(mechanism=(2,), cause=mice, effect=mice,
+                              subsystem=subsystem, phi=phi)
+
+    c = concept(np.array([0.0, 1.0]))
+    # Hashes agree with `emd_eq`, even across subsystems and for negative
+    # zeros.
+    for other in [concept(np.array([0.0, 1.0]), subsystem=subsys_n1n2),
+                  concept(np.array([-0.0, 1.0]))]:
+        assert c.emd_eq(other)
+        assert c.emd_hash() == other.emd_hash()
+    assert c.emd_hash() != concept(np.array([1.0, 0.0])).emd_hash()
+    assert c.emd_hash() != concept(np.array([0.0, 1.0]), phi=2.0).emd_hash()
+
+
 def test_concept_hashing_one_subsystem_is_subset_of_another(s, subsys_n1n2):
     phi = 1.0
     mice = models.Mice(mip(mech=(), purv=(1, 2), phi=phi))
@@ -5,6 +5,8 @@
 import pytest
 import numpy as np
 
+from pyphi import config, examples, utils
+from pyphi.macro import MacroSubsystem
 from pyphi.network import Network
 
 
@@ -85,3 +87,25 @@ def test_repr(standard):
 
 def test_str(standard):
     print(str(standard))
+
+
+def test_state_reachable():
+    network = examples.basic_network()
+    for state in utils.all_states(network.size):
+        for nodes in list(utils.powerset(network.node_indices))[1:]:
+            with config.override(VALIDATE_SUBSYSTEM_STATES=False):
+                subsystem = MacroSubsystem(network, state, nodes)
+            # The generic check done over the TPM of the subsystem
+            assert (network.state_reachable(state, nodes) ==
+                    subsystem.state_reachable())
+
+
+def test_strongly_connected():
+    cm = np.array([[0, 1, 0, 0],
+                   [0, 0, 1, 0],
+                   [1, 0, 0, 1],
+                   [0, 0, 0, 0]])
+    network = Network(np.ones([2] * 4 + [4]) / 2, connectivity_matrix=cm)
+    for nodes in utils.powerset(network.node_indices):
+        assert (network.strongly_connected(nodes) ==
+                utils.strongly_connected(cm, nodes))
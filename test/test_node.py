@@ -4,6 +4,7 @@
 
 import numpy as np
 
+from pyphi.models import Cut
 from pyphi.network import Network
 from pyphi.subsystem import Subsystem
 from pyphi.node import Node, expand_node_tpm
@@ -30,6 +31,14 @@ def test_node_init_tpm(s):
         assert np.array_equal(node.tpm, answer[node.index])
 
 
+def test_node_tpms_are_shared(s):
+    # The cut only severs the inputs of nodes 0 and 2 from node 1
+    cut_s = s.apply_cut(Cut((1,), (0, 2)))
+    assert cut_s.nodes[0].tpm is not s.nodes[0].tpm
+    assert cut_s.nodes[1].tpm is s.nodes[1].tpm
+    assert cut_s.nodes[2].tpm is not s.nodes[2].tpm
+
+
 def test_node_init_inputs(s):
     answer = [
         s.nodes[1:],
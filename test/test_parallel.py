@@ -38,3 +38,39 @@ def test_num_processes():
     # Ok
     with config.override(NUMBER_OF_CORES=1):
         assert parallel.get_num_processes() == 1
+
+
+def _square(x, offset):
+    return x * x + offset
+
+
+@pytest.mark.parametrize('chunk_size', [None, 3])
+def test_imap_chunked(chunk_size):
+    with config.override(NUMBER_OF_CORES=1, PARALLEL_CHUNK_SIZE=chunk_size):
+        results = parallel.imap_chunked(_square, range(20), args=(1,))
+        assert sorted(results) == [x * x + 1 for x in range(20)]
+
+
+def _is_even(x):
+    return x % 2 == 0
+
+
+def test_imap_chunked_keep():
+    with config.override(NUMBER_OF_CORES=1, PARALLEL_CHUNK_SIZE=3):
+        results = parallel.imap_chunked(_square, range(20), args=(1,),
+                                        keep=_is_even)
+        assert sorted(results) == [x * x + 1 for x in range(1, 20, 2)]
+
+
+def test_chunk_sizer():
+    sizer = parallel._ChunkSizer(2)
+    # Single items are sent until the cost has been measured.
+    assert sizer.size(100) == 1
+    sizer.record(10, 0.1)
+    with config.override(PARALLEL_CHUNK_TARGET_TIME=0.2):
+        assert sizer.size(100) == 20
+        # Smaller chunks at the end keep all the workers busy.
+        assert sizer.size(20) == 5
+        assert sizer.size(1) == 1
+    with config.override(PARALLEL_CHUNK_SIZE=7):
+        assert sizer.size(100) == 7
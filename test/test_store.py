@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# test_store.py
+
+import os
+
+from pyphi import compute, models
+from pyphi.store import BigMipStore
+
+
+def test_store_round_trip(s, tmpdir):
+    store = BigMipStore(str(tmpdir))
+    mip = compute.big_mip(s)
+    key = hash(s)
+
+    assert key not in store
+    assert store.load(key, s) is None
+    store.save(key, mip)
+
+    assert key in store
+    assert len(store) == 1
+    assert store.summary(key) == (mip.phi, mip.cut)
+    loaded = store.load(key, s)
+    assert loaded == mip
+    assert loaded.cut == mip.cut
+    assert loaded.time == mip.time
+    # Partitioned repertoires are restored even though they are not compared.
+    for concept, loaded_concept in zip(mip.unpartitioned_constellation,
+                                       loaded.unpartitioned_constellation):
+        assert (concept.cause.mip.partition ==
+                loaded_concept.cause.mip.partition)
+
+    # Other readers see the result.
+    assert BigMipStore(str(tmpdir)).load(key, s) == mip
+
+
+def test_store_null_bigmip(s_empty, tmpdir):
+    store = BigMipStore(str(tmpdir))
+    mip = models._null_bigmip(s_empty)
+    store.save(0, mip)
+    loaded = store.load(0, s_empty)
+    assert loaded == mip
+    assert loaded.cut_subsystem is s_empty
+
+
+def test_store_ignores_partially_written_record(s, tmpdir):
+    store = BigMipStore(str(tmpdir))
+    mip = compute.big_mip(s)
+    store.save(0, mip)
+    # Simulate a writer that was killed while appending a record.
+    with open(store.index_path, 'ab') as f:
+        f.write(b'\x80\x04garbage')
+
+    reader = BigMipStore(str(tmpdir))
+    assert len(reader) == 1
+    reader.save(1, mip)
+    assert len(BigMipStore(str(tmpdir))) == 2
+    assert BigMipStore(str(tmpdir)).load(1, s) == mip
+    assert os.path.getsize(store.data_path) % 8 == 0
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# test_symmetry.py
+
+import numpy as np
+import pytest
+
+from pyphi import (Network, Subsystem, checkpoint, compute, config, examples,
+                   macro, symmetry, utils)
+from pyphi.compute.big_phi import (_find_mip_parallel, _resume_find_mip,
+                                   big_mip_bipartitions)
+from pyphi.models import Cut, _null_bigmip
+
+
+def majority_ring():
+    """Return a ring of four nodes, each of which is on if the majority of
+    itself and its two neighbours were on.
+
+    Many mechanisms of this network are maximally irreducible over several
+    purviews.
+    """
+    n = 4
+    tpm = [[int(sum(state[j % n] for j in (i - 1, i, i + 1)) >= 2)
+            for i in range(n)]
+           for state in utils.all_states(n)]
+    cm = np.zeros([n, n])
+    for i in range(n):
+        for j in (i - 1, i, i + 1):
+            cm[j % n, i] = 1
+    return Network(tpm, connectivity_matrix=cm)
+
+
+def group(generators, size):
+    """Return every permutation generated by ``generators``."""
+    elements = {tuple(range(size))}
+    frontier = list(elements)
+    while frontier:
+        perm = frontier.pop()
+        for g in generators:
+            product = tuple(g[i] for i in perm)
+            if product not in elements:
+                elements.add(product)
+                frontier.append(product)
+    return elements
+
+
+def test_automorphisms():
+    network = examples.xor_network()
+    # Every permutation of the XOR network is an automorphism when all the
+    # nodes are in the same state...
+    generators = symmetry.automorphisms(network.tpm, network.cm, (0, 0, 0))
+    assert len(group(generators, 3)) == 6
+    # ...but otherwise only those which don't move the node that's on.
+    assert symmetry.automorphisms(network.tpm, network.cm, (1, 0, 0)) == [
+        (0, 2, 1)]
+
+    network = examples.basic_network()
+    assert symmetry.automorphisms(network.tpm, network.cm, (1, 0, 0)) == []
+
+
+def test_orbits():
+    rotation = (1, 2, 0)
+    orbits = symmetry.orbits(utils.powerset(range(3)), [rotation], 3)
+    assert orbits[(2,)][0] == (0,)
+    assert orbits[(0, 2)][0] == (0, 1)
+    assert orbits[(0, 1, 2)] == ((0, 1, 2), (0, 1, 2))
+    for subset, (representative, perm) in orbits.items():
+        assert symmetry.permute(perm, representative) == subset
+
+
+@pytest.mark.parametrize('network,state', [
+    (examples.xor_network(), (0, 0, 0)),
+    # Has tied purviews, so (0, 1, 2) and (0, 1, 3) have different phi.
+    (majority_ring(), (0, 0, 0, 0)),
+])
+def test_complexes_exploit_symmetry(network, state, flushcache,
+                                    restore_fs_cache):
+    flushcache()
+    expected = compute.complexes(network, state)
+    with config.override(EXPLOIT_SYMMETRY=True):
+        result = compute.complexes(network, state)
+
+    assert len(result) == len(expected)
+    for mip, expected_mip in zip(result, expected):
+        assert mip.subsystem == expected_mip.subsystem
+        assert mip.phi == expected_mip.phi
+        assert (mip.unpartitioned_constellation ==
+                expected_mip.unpartitioned_constellation)
+        # Symmetric cuts are equally minimal, so the permuted cut may differ
+        # from the one found directly, but it gives the same phi.
+        cut_mip = compute.evaluate_cut(mip.subsystem, mip.cut,
+                                       mip.unpartitioned_constellation)
+        assert cut_mip.phi == mip.phi
+
+
+def test_subsystem_automorphisms():
+    network = examples.xor_network()
+    # Nodes 1 and 2 are interchangeable given the state of node 0.
+    subsystem = Subsystem(network, (1, 0, 0), (1, 2))
+    assert subsystem.automorphisms() == [(0, 2, 1)]
+
+
+def test_big_mip_bipartitions_exploit_symmetry(flushcache, restore_fs_cache):
+    flushcache()
+    subsystem = Subsystem(examples.xor_network(), (0, 0, 0), (0, 1, 2))
+    cuts = big_mip_bipartitions(subsystem.cut_indices,
+                                subsystem.automorphisms())
+    assert cuts == [Cut((0,), (1, 2)), Cut((0, 1), (2,))]
+
+    expected = compute.big_mip(subsystem)
+    with config.override(EXPLOIT_SYMMETRY=True):
+        assert compute.big_mip(subsystem).phi == expected.phi
+
+
+@config.override(PARALLEL_CUT_EVALUATION=False)
+def test_big_mip_exploit_symmetry_with_tied_purviews(flushcache,
+                                                     restore_fs_cache):
+    flushcache()
+    subsystem = Subsystem(majority_ring(), (0, 0, 0, 0), (0, 1, 2))
+    constellation = compute.constellation(subsystem)
+    assert not symmetry.unique_mice(constellation)
+    # Mirror-image cuts give different phi because of the ties.
+    assert compute.evaluate_cut(subsystem, Cut((1, 2), (0,)),
+                                constellation).phi == 0.306979
+    assert compute.evaluate_cut(subsystem, Cut((0, 1), (2,)),
+                                constellation).phi == 0.347795
+
+    expected = compute.big_mip(subsystem)
+    with config.override(EXPLOIT_SYMMETRY=True):
+        mip = compute.big_mip(subsystem)
+    assert mip.phi == expected.phi == 0.306979
+    assert mip.cut == expected.cut
+
+
+@config.override(EXPLOIT_SYMMETRY=True, PARALLEL_CUT_EVALUATION=True)
+def test_resume_parallel_cut_orbits_from_checkpoint(tmpdir, flushcache,
+                                                    restore_fs_cache):
+    flushcache()
+    subsystem = Subsystem(majority_ring(), (0, 0, 0, 0), (0, 1, 2))
+    automorphisms = subsystem.automorphisms()
+    cuts = big_mip_bipartitions(subsystem.cut_indices, automorphisms)
+    constellation = compute.constellation(subsystem)
+    expected = compute.big_mip(subsystem)
+
+    def min_mip():
+        mip = _null_bigmip(subsystem)
+        mip.phi = float('inf')
+        return mip
+
+    with config.override(CHECKPOINT_DIRECTORY=str(tmpdir)):
+        checkpoint_ = checkpoint.Checkpoint(subsystem)
+        mip = _find_mip_parallel(subsystem, cuts, constellation, min_mip(),
+                                 checkpoint=checkpoint_,
+                                 automorphisms=automorphisms)
+        checkpoint_.flush()
+        # The minimal cut of the orbit of Cut((0, 1), (2,)) is its mirror
+        # image, but the cut that was dispatched is the one recorded...
+        assert mip.cut == Cut((1, 2), (0,))
+        assert set(checkpoint_.finished_cuts()) == set(cuts)
+
+        # ...so resuming doesn't evaluate any cut again.
+        def find_mip(*args, **kwargs):
+            raise AssertionError('No cuts should remain')
+        resumed = _resume_find_mip(find_mip, subsystem, cuts, constellation,
+                                   min_mip(), checkpoint.Checkpoint(subsystem),
+                                   automorphisms)
+    assert resumed.phi == mip.phi == expected.phi
+    assert resumed.cut == expected.cut
+
+
+def test_macro_phis_are_only_reused_when_unique(flushcache, restore_fs_cache,
+                                                monkeypatch):
+    network = majority_ring()
+    state = (0, 0, 0, 0)
+    # Equivalent macro-systems whose MICE are tied
+    subsystem = macro.MacroSubsystem(
+        network, state, network.node_indices,
+        coarse_grain=macro.CoarseGrain(((0, 3), (1, 2)),
+                                       (((0, 1), (2,)), ((0, 1), (2,)))))
+    big_mip = compute.big_mip(subsystem)
+    assert not big_mip.unique
+    key = macro.equivalence_key(subsystem)
+    assert macro._equivalent_big_phi(
+        subsystem, {key: (big_mip.phi + 1, False)}) == big_mip.phi
+    assert macro._equivalent_big_phi(
+        subsystem, {key: (big_mip.phi + 1, True)}) == big_mip.phi + 1
+
+    computed = []
+    macro_big_phi = macro._macro_big_phi
+
+    def stream(unique):
+        def counting_big_phi(subsystem):
+            computed.append(subsystem)
+            phi, is_unique = macro_big_phi(subsystem)
+            return phi, is_unique and unique
+        monkeypatch.setattr(macro, '_macro_big_phi', counting_big_phi)
+        del computed[:]
+        return [m for _, m, _ in macro.stream_emergence(network, state,
+                                                        micro_phi=0.0)]
+
+    results = stream(unique=True)
+    assert [m.phi for m in results] == [
+        compute.big_phi(macro.MacroSubsystem(network, state, m.system,
+                                             coarse_grain=m.coarse_grain))
+        for m in results]
+    deduplicated = len(computed)
+    # If no phi is unique, every candidate is computed directly.
+    assert [m.phi for m in stream(unique=False)] == [m.phi for m in results]
+    assert len(computed) > deduplicated
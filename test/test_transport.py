@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# test_transport.py
+
+import numpy as np
+import pytest
+
+from pyphi import compute, config, utils
+from pyphi.compute import transport
+from pyphi.compute.big_phi import big_mip_bipartitions
+
+
+def test_solve_matches_pyemd():
+    np.random.seed(0)
+    for m, n in [(1, 1), (3, 2), (5, 7), (8, 8)]:
+        costs = np.random.rand(m, n)
+        supply = np.random.rand(m)
+        demand = np.random.rand(n)
+        demand *= supply.sum() / demand.sum()
+        cost, flow, basis, _ = transport.solve(costs, supply, demand)
+        assert len(basis) == m + n - 1
+        assert np.allclose(flow.sum(1), supply)
+        assert np.allclose(flow.sum(0), demand)
+        # Compare with pyemd on the equivalent square problem.
+        distance_matrix = np.full([m + n] * 2, costs.max() + 1)
+        distance_matrix[:m, m:] = costs
+        distance_matrix[m:, :m] = costs.T
+        d1 = np.concatenate([supply, np.zeros(n)])
+        d2 = np.concatenate([np.zeros(m), demand])
+        assert cost == pytest.approx(utils.emd(d1, d2, distance_matrix),
+                                     abs=1e-5)
+
+
+def test_solve_degenerate():
+    costs = np.array([[1.0, 2.0], [3.0, 1.0]])
+    cost, flow, basis, _ = transport.solve(costs, np.array([1.0, 1.0]),
+                                           np.array([1.0, 1.0]))
+    assert cost == 2.0
+    assert len(basis) == 3
+
+
+def test_transport_solver_big_mip(s_noised):
+    transport.reset_timings()
+    with config.override(CONSTELLATION_EMD_SOLVER='transport',
+                         PARALLEL_CUT_EVALUATION=False):
+        unpartitioned = compute.constellation(s_noised)
+        for cut in big_mip_bipartitions(s_noised.cut_indices):
+            mip = compute.evaluate_cut(s_noised, cut, unpartitioned)
+            with config.override(CONSTELLATION_EMD_SOLVER='pyemd'):
+                expected = compute.evaluate_cut(s_noised, cut, unpartitioned)
+            assert mip.phi == pytest.approx(expected.phi, abs=1e-5)
+    timings = transport.timings()
+    assert timings['transport'][0] > 0
+    assert timings['pyemd'][0] == timings['transport'][0]
+
+
+def test_solve_assignment_problem():
+    # Every basic solution of an assignment problem is degenerate, so this
+    # exercises Bland's rule.
+    np.random.seed(1)
+    n = 10
+    costs = np.random.randint(0, 3, size=[n, n]).astype(float)
+    cost, flow, basis, _ = transport.solve(costs, np.ones(n), np.ones(n))
+    distance_matrix = np.full([2 * n] * 2, costs.max() + 1)
+    distance_matrix[:n, n:] = costs
+    distance_matrix[n:, :n] = costs.T
+    d1 = np.concatenate([np.ones(n), np.zeros(n)])
+    d2 = np.concatenate([np.zeros(n), np.ones(n)])
+    assert cost == pytest.approx(utils.emd(d1, d2, distance_matrix), abs=1e-5)
+
+
+def test_solve_iteration_limit():
+    costs = np.array([[1.0, 2.0], [3.0, 1.0]])
+    # The greedy initial solution is optimal...
+    assert transport.solve(costs, np.array([1.0, 1.0]), np.array([1.0, 1.0]),
+                           max_iterations=0)[0] == 2.0
+    # ...but here it isn't.
+    costs = np.array([[1.0, 1.5], [1.2, 10.0]])
+    with pytest.raises(transport.IterationLimit):
+        transport.solve(costs, np.array([1.0, 1.0]), np.array([1.0, 1.0]),
+                        max_iterations=0)
+
+
+def test_transport_solver_falls_back_to_pyemd(s_noised, monkeypatch):
+    def solve(*args, **kwargs):
+        raise transport.IterationLimit('No optimal solution')
+    monkeypatch.setattr(transport, 'solve', solve)
+    cut = big_mip_bipartitions(s_noised.cut_indices)[0]
+    with config.override(PARALLEL_CUT_EVALUATION=False):
+        unpartitioned = compute.constellation(s_noised)
+        expected = compute.evaluate_cut(s_noised, cut, unpartitioned)
+        with config.override(CONSTELLATION_EMD_SOLVER='transport'):
+            mip = compute.evaluate_cut(s_noised, cut, unpartitioned,
+                                       transport.WarmStart())
+    assert mip.phi == expected.phi
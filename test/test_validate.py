@@ -4,7 +4,7 @@
 import numpy as np
 import pytest
 
-from pyphi import exceptions, macro, Network, Subsystem, validate
+from pyphi import convert, exceptions, macro, Network, Subsystem, validate
 
 
 def test_validate_direction():
@@ -37,6 +37,17 @@ def test_validate_tpm_conditional_independence():
         validate.tpm(tpm)
 
 
+def test_validate_conditional_independence_state_by_state():
+    np.random.seed(0)
+    sbs = convert.state_by_node2state_by_state(np.random.rand(64, 6))
+    assert validate.conditionally_independent(sbs)
+    # Make the last row depend jointly on the nodes.
+    sbs[-1] = 0
+    sbs[-1, [0, -1]] = 0.5
+    with pytest.raises(exceptions.ConditionallyDependentError):
+        validate.conditionally_independent(sbs)
+
+
 def test_validate_cm_valid(s):
     assert validate.connectivity_matrix(s.network.connectivity_matrix)
 